@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+analyze_order.py
+
+Análisis del orden de recuerdo (agrupamiento temporal). El texto del recuerdo
+conserva el orden en que el participante escribió las palabras y el orden de
+estudio es fijo (el de `stimuli.json`, igual que `trialList` en `index.html`),
+así que cada palabra recordada se asigna a su posición de estudio con
+`analyze_recall.recall_sequence()`.
+
+A partir de esas secuencias se calculan:
+
+- lag-CRP: probabilidad de recuerdo condicionada al lag (posición de estudio
+  siguiente − actual), sobre las transiciones posibles (palabras aún no recordadas)
+- puntuación del factor temporal (percentil del |lag| real entre los posibles;
+  0.5 = sin agrupamiento temporal)
+- probabilidad de primer recuerdo por posición de estudio
+
+por grupo y por tipo de procesamiento (S/A) de la palabra de origen de cada
+transición. Todo se calcula sobre una matriz participante × posición de salida
+rellenada con -1, con reducciones `np.bincount`, sin bucles por participante.
+
+Salida:
+- `results/recall_order_by_participant.csv` : factor temporal y primer recuerdo por participante
+- `results/lag_crp.csv` : lag-CRP por grupo × tipo de procesamiento × lag
+- `results/first_recall.csv` : probabilidad de primer recuerdo por grupo × posición
+- `results/recall_order_results.txt` : resumen y pruebas
+
+Dependencias: pandas, numpy, scipy
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from analyze_recall import recall_sequence
+from archive_io import first_row
+from clustering import pad_sequences
+from dedup import iter_unique_exports
+from stimuli import load_stimuli
+
+CUES = ['S', 'A']
+MAX_LAG_REPORT = 5
+CHUNK = 20000
+
+
+def transition_stats(pos, item_cue, n_items):
+    """
+    Lag-CRP counts and temporal factor scores for a padded position matrix.
+
+    pos: (P, O) study positions in output order, -1 = padding
+    item_cue: (P, n_items) cue code (0=S, 1=A) of every study position per participant
+    Returns
+      actual, possible: (P, 2, 2*n_items - 1) counts per participant x origin cue x lag
+      tf_sum, tf_n: (P, 2) sum and number of temporal factor percentiles per origin cue
+    """
+    n_p, n_out = pos.shape
+    n_lags = 2 * n_items - 1
+    actual = np.zeros((n_p, 2, n_lags))
+    possible = np.zeros((n_p, 2, n_lags))
+    tf_sum = np.zeros((n_p, 2))
+    tf_n = np.zeros((n_p, 2))
+    if n_out < 2:
+        return actual, possible, tf_sum, tf_n
+
+    # chunk over participants to bound the (P, O, n_items) availability array
+    for lo in range(0, n_p, CHUNK):
+        p = pos[lo:lo + CHUNK]
+        n = len(p)
+        rows = np.arange(n)[:, None]
+
+        # recalled[i, j, q]: position q recalled at outputs 0..j
+        onehot = np.zeros((n, n_out, n_items + 1), dtype=bool)
+        onehot[rows, np.arange(n_out)[None, :], p] = True  # padding lands in the extra column
+        recalled = np.cumsum(onehot[:, :, :n_items], axis=1, dtype=np.int8) > 0
+
+        src = p[:, :-1]
+        dst = p[:, 1:]
+        valid = (src >= 0) & (dst >= 0)
+        src_c = np.where(valid, src, 0)
+        cue = np.take_along_axis(item_cue[lo:lo + n], src_c, axis=1)
+
+        # transitions: (participant, output j) -> available positions q
+        avail = ~recalled[:, :-1, :] & valid[:, :, None]
+        lag_all = np.arange(n_items)[None, None, :] - src_c[:, :, None]
+        lag_act = dst - src_c
+
+        key = ((np.arange(n)[:, None] * 2 + cue) * n_lags)
+        act_keys = (key + lag_act + n_items - 1)[valid]
+        pos_keys = (key[:, :, None] + lag_all + n_items - 1)[avail]
+        actual[lo:lo + n] = np.bincount(act_keys, minlength=n * 2 * n_lags).reshape(n, 2, n_lags)
+        possible[lo:lo + n] = np.bincount(pos_keys, minlength=n * 2 * n_lags).reshape(n, 2, n_lags)
+
+        # temporal factor: percentile of the actual |lag| among the possible ones
+        # (farther lags rank lower, ties share the average rank)
+        dist_all = np.abs(lag_all)
+        dist_act = np.abs(lag_act)[:, :, None]
+        greater = ((dist_all > dist_act) & avail).sum(axis=2)
+        equal = ((dist_all == dist_act) & avail).sum(axis=2)
+        n_avail = avail.sum(axis=2)
+        scored = valid & (n_avail > 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct = (greater + (equal - 1) / 2) / (n_avail - 1)
+        tkey = (np.arange(n)[:, None] * 2 + cue)[scored]
+        tf_sum[lo:lo + n] = np.bincount(tkey, weights=pct[scored], minlength=n * 2).reshape(n, 2)
+        tf_n[lo:lo + n] = np.bincount(tkey, minlength=n * 2).reshape(n, 2)
+
+    return actual, possible, tf_sum, tf_n
+
+
+def load_sequences(datos_path, stim, duplicates='drop'):
+    """Participant, Group, List and ordered recall (study positions) of every export"""
+    records = []
+    for pid, text in iter_unique_exports(datos_path, duplicates):
+        first = first_row(text)
+        if first is None:
+            continue
+        list_version = first.get('list') or first.get('List') or ''
+        if list_version not in stim['cues']:
+            continue
+        records.append({
+            'Participant': pid,
+            'Group': first.get('group') or first.get('Group') or 'Unknown',
+            'List': list_version,
+            'Sequence': recall_sequence(first.get('recall', ''), stim),
+        })
+    return records
+
+
+def _mean_lag_crp(actual, possible):
+    """Mean over participants of the per-participant CRP (participants without that lag excluded)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        crp = actual / possible
+    n = np.isfinite(crp).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.nansum(crp, axis=0) / n, n
+
+
+def analyze_order(datos_path='datos/normalized', results_path='results', duplicates='drop'):
+    stim = load_stimuli()
+    results = Path(results_path)
+    results.mkdir(parents=True, exist_ok=True)
+
+    records = load_sequences(datos_path, stim, duplicates)
+    if not records:
+        print(f"No se encontraron CSVs en {Path(datos_path).resolve()}")
+        return 1
+
+    n_items = len(stim['words'])
+    n_lags = 2 * n_items - 1
+    lags = np.arange(-(n_items - 1), n_items)
+    pos = pad_sequences([r['Sequence'] for r in records])
+    lists = [r['List'] for r in records]
+    item_cue = np.vstack([(stim['cues'][lv] == 'A').astype(np.int64) for lv in lists])
+    group_codes, groups = pd.factorize(pd.Series([r['Group'] for r in records]), sort=True)
+
+    actual, possible, tf_sum, tf_n = transition_stats(pos, item_cue, n_items)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tf_cue = tf_sum / tf_n
+        tf_all = tf_sum.sum(axis=1) / tf_n.sum(axis=1)
+
+    n_recalled = (pos >= 0).sum(axis=1)
+    first_pos = pos[:, 0]
+    has_first = first_pos >= 0
+    first_cue = np.where(has_first, item_cue[np.arange(len(pos)), np.maximum(first_pos, 0)], -1)
+
+    per_participant = pd.DataFrame({
+        'Participant': [r['Participant'] for r in records],
+        'Group': [r['Group'] for r in records],
+        'List': lists,
+        'N_recalled': n_recalled,
+        'N_transitions': tf_n.sum(axis=1).astype(int),
+        'TF': tf_all,
+        'TF_S': tf_cue[:, 0],
+        'TF_A': tf_cue[:, 1],
+        'First_position': np.where(has_first, first_pos + 1, np.nan),
+        'First_word': [stim['words'][p] if p >= 0 else '' for p in first_pos],
+        'First_cue': [CUES[c] if c >= 0 else '' for c in first_cue],
+    })
+    pp_path = results / 'recall_order_by_participant.csv'
+    per_participant.to_csv(pp_path, index=False)
+
+    # lag-CRP per group x origin cue (and pooled over cues)
+    crp_rows = []
+    crp_summary = {}
+    for gi, g in enumerate(groups):
+        sel = group_codes == gi
+        for label, a, p in [('S', actual[sel, 0], possible[sel, 0]),
+                            ('A', actual[sel, 1], possible[sel, 1]),
+                            ('all', actual[sel].sum(axis=1), possible[sel].sum(axis=1))]:
+            crp, n = _mean_lag_crp(a, p)
+            crp_summary[(g, label)] = crp
+            crp_rows.append(pd.DataFrame({
+                'Group': g, 'Cue': label, 'Lag': lags, 'CRP': crp,
+                'Actual': a.sum(axis=0), 'Possible': p.sum(axis=0), 'n_participants': n,
+            }))
+    lag_crp = pd.concat(crp_rows, ignore_index=True)
+    lag_crp = lag_crp.loc[lag_crp['Lag'] != 0]
+    crp_path = results / 'lag_crp.csv'
+    lag_crp.to_csv(crp_path, index=False)
+
+    # first-recall probability per group x study position
+    fkey = group_codes[has_first] * n_items + first_pos[has_first]
+    first_counts = np.bincount(fkey, minlength=len(groups) * n_items).reshape(len(groups), n_items)
+    n_group = np.bincount(group_codes, minlength=len(groups))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p_first = first_counts / n_group[:, None]
+    first_recall = pd.DataFrame({
+        'Group': np.repeat(np.asarray(groups), n_items),
+        'Position': np.tile(np.arange(1, n_items + 1), len(groups)),
+        'Word': np.tile(stim['words'], len(groups)),
+        'N_first': first_counts.ravel(),
+        'P_first': p_first.ravel(),
+    })
+    fr_path = results / 'first_recall.csv'
+    first_recall.to_csv(fr_path, index=False)
+
+    out_lines = []
+    out_lines.append('RECALL ORDER SUMMARY (temporal clustering)')
+    out_lines.append('==========================================')
+    out_lines.append(f'N participants: {len(records)}, with >= 2 recalled words: {int((n_recalled >= 2).sum())}')
+    out_lines.append('Cue S/A refers to the study task of the word a transition starts from.')
+    out_lines.append('')
+
+    out_lines.append('Temporal factor score (0.5 = no temporal clustering; one-sample t-test vs 0.5)')
+    for gi, g in enumerate(groups):
+        sel = group_codes == gi
+        for label, vals in [('all', tf_all[sel]), ('S', tf_cue[sel, 0]), ('A', tf_cue[sel, 1])]:
+            vals = vals[np.isfinite(vals)]
+            if vals.size > 1:
+                t, p = stats.ttest_1samp(vals, 0.5)
+                out_lines.append(f'{g} - {label}: mean={vals.mean():.3f}, t={t:.3f}, p={p:.4f}, n={vals.size}')
+            elif vals.size == 1:
+                out_lines.append(f'{g} - {label}: mean={vals.mean():.3f}, n=1')
+    valid_tf = np.isfinite(tf_all)
+    if len(groups) == 2:
+        a = tf_all[valid_tf & (group_codes == 0)]
+        b = tf_all[valid_tf & (group_codes == 1)]
+        if a.size > 1 and b.size > 1:
+            t, p = stats.ttest_ind(a, b)
+            out_lines.append(f'{groups[0]} vs {groups[1]}: t={t:.3f}, p={p:.4f}')
+    both = np.isfinite(tf_cue).all(axis=1)
+    if both.sum() > 1:
+        t, p = stats.ttest_rel(tf_cue[both, 0], tf_cue[both, 1])
+        out_lines.append(f'S vs A (paired, from-cue): mean_diff={np.mean(tf_cue[both, 0] - tf_cue[both, 1]):.3f}, '
+                         f't={t:.3f}, p={p:.4f}, n={int(both.sum())}')
+    out_lines.append('')
+
+    near = (np.abs(lags) <= MAX_LAG_REPORT) & (lags != 0)
+    out_lines.append(f'Lag-CRP (mean over participants), lags {-MAX_LAG_REPORT}..{MAX_LAG_REPORT}')
+    out_lines.append('Lags: ' + ' '.join(f'{l:>6d}' for l in lags[near]))
+    for (g, label), crp in crp_summary.items():
+        out_lines.append(f'{g} - {label}: ' + ' '.join(f'{v:6.3f}' for v in crp[near]))
+    out_lines.append('')
+
+    out_lines.append('First recall')
+    for gi, g in enumerate(groups):
+        sel = (group_codes == gi) & has_first
+        if not sel.any():
+            continue
+        p_s = np.mean(first_cue[sel] == 0)
+        top = np.argsort(-first_counts[gi], kind='stable')[:3]
+        tops = ', '.join(f'{q + 1} {stim["words"][q]} ({p_first[gi, q]:.2f})' for q in top if first_counts[gi, q])
+        out_lines.append(f'{g}: P(first recall is S)={p_s:.2f}, P(first is A)={1 - p_s:.2f}, '
+                         f'n={int(sel.sum())}; most frequent positions: {tops}')
+
+    out_path = results / 'recall_order_results.txt'
+    with open(out_path, 'w', encoding='utf-8') as fh:
+        fh.write('\n'.join(out_lines))
+
+    print(f'Orden de recuerdo por participante guardado en: {pp_path}')
+    print(f'Lag-CRP guardado en: {crp_path}')
+    print(f'Primer recuerdo guardado en: {fr_path}')
+    print(f'Análisis del orden de recuerdo guardado en: {out_path}')
+    return 0
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser(description='Agrupamiento temporal del recuerdo: lag-CRP, factor temporal, primer recuerdo')
+    p.add_argument('--datos', default='datos/normalized',
+                   help='Carpeta con los CSV o archivo .zip/.tar.gz (default: datos/normalized)')
+    p.add_argument('--out', default='results', help='Carpeta para resultados (default: results)')
+    p.add_argument('--duplicates', choices=['drop', 'flag'], default='drop',
+                   help='Envíos duplicados (huella exacta o cercana): excluirlos (drop, default) '
+                        'o mantenerlos y solo reportarlos (flag)')
+    args = p.parse_args()
+
+    sys.exit(analyze_order(datos_path=args.datos, results_path=args.out, duplicates=args.duplicates))
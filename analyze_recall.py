@@ -19,6 +19,8 @@ Instalación rápida: `pip install pandas numpy scipy statsmodels pingouin`
 
 from pathlib import Path
 import re
+import shutil
+import tempfile
 import unicodedata
 import sys
 import warnings
@@ -28,6 +30,14 @@ import pandas as pd
 
 from scipy import stats
 
+from archive_io import first_row
+from clustering import arc_scores
+from dedup import DuplicateIndex, iter_unique_exports
+from score_attention import parse_marked, score_attention
+from stimuli import load_stimuli
+import suffstats
+from suffstats import leave_one_out
+
 try:
     import pingouin as pg
     HAS_PINGOUIN = True
@@ -68,96 +78,164 @@ def tokenize(s):
     return s2.split(' ')
 
 
-def analyze_folder(datos_path='datos/normalized', results_path='results'):
+def recall_sequence(recall_text, stim):
+    """
+    Manifest indices of the recalled words in output order (first mention of each).
+
+    Same matching rule as recalled_mask: exact token match, else substring of the
+    normalized recall text (placed at the offset where the substring starts).
+    """
+    recall_norm = normalize_text(recall_text)
+    found = {}
+    for m in re.finditer(r'\S+', recall_norm):
+        i = stim['norm_index'].get(m.group())
+        if i is not None and i not in found:
+            found[i] = m.start()
+    for i, wnorm in enumerate(stim['normalized']):
+        if i not in found and wnorm:
+            pos = recall_norm.find(wnorm)
+            if pos >= 0:
+                found[i] = pos
+    return sorted(found, key=found.get)
+
+
+def recalled_mask(recall_text, stim):
+    """
+    Boolean array over the manifest words: True if the word appears in the recall
+    (exact token match, else substring of the normalized recall text)
+    """
+    recalled = np.zeros(len(stim['words']), dtype=bool)
+    recalled[recall_sequence(recall_text, stim)] = True
+    return recalled
+
+
+def read_participant(pid, text, stim):
+    """
+    Reduce one export (participant id from the file name, CSV text) to its Table 1 record.
+
+    Returns (record, filler_letters, filler_marked, category_sequence) or None if the
+    file is skipped; category_sequence holds the category codes of the recalled
+    words in output order (uncategorized words left out), for the ARC score.
+    Only the first row is parsed: metadata and recall are repeated in every row and
+    the S/A items come from the stimulus manifest.
+    """
+    first = first_row(text)
+
+    if first is None:
+        print(f"Archivo vacío: {pid}")
+        return None
+
+    # expected columns: group,list,edad,sexo,estudios,word,cue,response,recall
+    # metadata usually repeated in every row; take first occurrence
+    group = first.get('group') or first.get('Group') or 'Unknown'
+    list_version = first.get('list') or first.get('List') or ''
+    edad = first.get('edad') or first.get('edad') or ''
+    sexo = first.get('sexo') or ''
+    estudios = first.get('estudios') or ''
+
+    recall_text = first.get('recall', '')
+    sequence = recall_sequence(recall_text, stim)
+    recalled = np.zeros(len(stim['words']), dtype=bool)
+    recalled[sequence] = True
+    categories = stim['category_codes'][sequence]
+
+    # S/A items come from the stimulus manifest for this list version
+    masks = stim['masks'].get(list_version)
+    if masks is None:
+        print(f"Archivo {pid}: lista '{list_version}' no definida en stimuli.json. Skipping.")
+        return None
+
+    s_matched, s_total = int(recalled[masks['S']].sum()), int(masks['S'].sum())
+    a_matched, a_total = int(recalled[masks['A']].sum()), int(masks['A'].sum())
+
+    perc_s = (s_matched / s_total * 100) if s_total > 0 else float('nan')
+    perc_a = (a_matched / a_total * 100) if a_total > 0 else float('nan')
+
+    record = {
+        'Participant': pid,
+        'Group': group,
+        'List': list_version,
+        'Edad': edad,
+        'Sexo': sexo,
+        'Estudios': estudios,
+        'S_matched': s_matched,
+        'S_total': s_total,
+        'A_matched': a_matched,
+        'A_total': a_total,
+        'Perc_S': perc_s,
+        'Perc_A': perc_a,
+    }
+    return record, first.get('filler_letters'), parse_marked(first.get('filler_marked')), categories[categories >= 0]
+
+
+def build_participant_table(parsed, n_categories):
+    """Per-participant DataFrame from read_participant() results, with ARC and attention scores joined"""
+    if not parsed:
+        return pd.DataFrame()
+    records, letters, marked, category_seqs = zip(*parsed)
+    dfp = pd.DataFrame(list(records))
+    # semantic clustering and attention (distractor) task scores for all participants in one pass
+    dfp['ARC'] = arc_scores(category_seqs, n_categories)['ARC']
+    att = score_attention(letters, marked)
+    return pd.concat([dfp, att[['Att_hits', 'Att_FA', 'Att_dprime']]], axis=1)
+
+
+def arc_summary_lines(group_levels, arc_sums):
+    """
+    Per-group ARC descriptives (and a two-group t-test) from [n, Σarc, Σarc²] per group,
+    so the in-memory and streaming paths report it identically
+    """
+    lines = ['Semantic clustering (ARC; 1 = perfect category clustering, 0 = chance)']
+    for g in group_levels:
+        n, sx, sxx = arc_sums.get(g, (0, 0.0, 0.0))
+        m, lo, hi = suffstats.mean_ci(sx, sxx, n)
+        lines.append(f'{g}: mean ARC={m:.3f}, 95% CI=[{lo:.3f}, {hi:.3f}], n={int(n)}')
+    if len(group_levels) == 2 and all(arc_sums.get(g, (0,))[0] > 1 for g in group_levels):
+        desc = []
+        for g in group_levels:
+            n, sx, sxx = arc_sums[g]
+            desc.append((sx / n, np.sqrt(max(sxx - sx ** 2 / n, 0) / (n - 1)), n))
+        t, pval = stats.ttest_ind_from_stats(*desc[0], *desc[1])
+        lines.append(f'{group_levels[0]} vs {group_levels[1]}: t={t:.3f}, p={pval:.4f}')
+    return lines
+
+
+def analyze_folder(datos_path='datos/normalized', results_path='results', min_dprime=None, duplicates='drop'):
+    stim = load_stimuli()
     datos = Path(datos_path)
     results = Path(results_path)
     results.mkdir(parents=True, exist_ok=True)
 
-    files = sorted(datos.glob('*.csv'))
-    if not files:
+    # exports are reduced one at a time; only the parsed records are kept
+    # repeated submissions (re-downloads) would otherwise count as extra participants
+    dup_index = DuplicateIndex()
+    parsed = []
+    n_files = 0
+    for pid, text in iter_unique_exports(datos, duplicates, dup_index):
+        n_files += 1
+        r = read_participant(pid, text, stim)
+        if r is not None:
+            parsed.append(r)
+    dup_index.close()
+    if n_files == 0:
         print(f"No se encontraron CSVs en {datos.resolve()}")
         return 1
-
-    rows = []
-
-    for f in files:
-        try:
-            df = pd.read_csv(f, encoding='utf-8', dtype=str)
-        except Exception:
-            df = pd.read_csv(f, encoding='latin-1', dtype=str)
-
-        if df.empty:
-            print(f"Archivo vacío: {f}")
-            continue
-
-        # extract participant id from filename
-        pid = f.stem
-
-        # expected columns: group,list,edad,sexo,estudios,word,cue,response,recall
-        # metadata usually repeated in every row; take first occurrence
-        first = df.iloc[0].to_dict()
-        group = first.get('group') or first.get('Group') or 'Unknown'
-        list_version = first.get('list') or first.get('List') or ''
-        edad = first.get('edad') or first.get('edad') or ''
-        sexo = first.get('sexo') or ''
-
-        # presented words and cues
-        if 'word' not in df.columns or 'cue' not in df.columns:
-            print(f"Archivo {f} no contiene las columnas esperadas 'word'/'cue'. Skipping.")
-            continue
-
-        # get unique presented words for each cue
-        s_words = df.loc[df['cue'] == 'S', 'word'].dropna().unique().tolist()
-        a_words = df.loc[df['cue'] == 'A', 'word'].dropna().unique().tolist()
-
-        recall_text = first.get('recall', '')
-
-        tokens = set(tokenize(recall_text))
-
-        # match words: normalize each presented word and check if appears among tokens
-        def count_recalled(word_list):
-            if not word_list:
-                return 0, 0
-            total = len(word_list)
-            matched = 0
-            for w in word_list:
-                wnorm = normalize_text(w)
-                # Some presented words can be multi-word; check any token equals or token sequence present
-                # We'll check exact token match first; also check if full normalized word is substring of recall_text
-                if wnorm in tokens:
-                    matched += 1
-                else:
-                    # fallback: check substring in normalized recall text
-                    if wnorm and wnorm in normalize_text(recall_text):
-                        matched += 1
-            return matched, total
-
-        s_matched, s_total = count_recalled(s_words)
-        a_matched, a_total = count_recalled(a_words)
-
-        perc_s = (s_matched / s_total * 100) if s_total > 0 else float('nan')
-        perc_a = (a_matched / a_total * 100) if a_total > 0 else float('nan')
-
-        rows.append({
-            'Participant': pid,
-            'Group': group,
-            'List': list_version,
-            'Edad': edad,
-            'Sexo': sexo,
-            'S_matched': s_matched,
-            'S_total': s_total,
-            'A_matched': a_matched,
-            'A_total': a_total,
-            'Perc_S': perc_s,
-            'Perc_A': perc_a,
-        })
-
-    dfp = pd.DataFrame(rows)
+    dfp = build_participant_table(parsed, len(stim['category_names']))
 
     if dfp.empty:
         print("No se pudieron procesar participantes.")
         return 1
 
+    excluded = pd.DataFrame(columns=dfp.columns)
+    if min_dprime is not None:
+        # participants without an exported attention task cannot be checked and are kept
+        low = dfp['Att_dprime'] < min_dprime
+        excluded = dfp.loc[low]
+        dfp = dfp.loc[~low].reset_index(drop=True)
+        if dfp.empty:
+            print(f"Todos los participantes quedan excluidos con d′ < {min_dprime}.")
+            return 1
+
     # Sort by Group so Intencional and Incidental are grouped together
     dfp = dfp.sort_values('Group').reset_index(drop=True)
     
@@ -181,7 +259,9 @@ def analyze_folder(datos_path='datos/normalized', results_path='results'):
                 mean_a = float(group_data['Perc_A'].astype(float).mean())
             except Exception:
                 mean_a = ''
-            summary_values = [f'Group_Mean_{group}', group, '', '', '', '', '', '', '', f'{mean_s}', f'{mean_a}']
+            summary = {'Participant': f'Group_Mean_{group}', 'Group': group,
+                       'Perc_S': f'{mean_s}', 'Perc_A': f'{mean_a}'}
+            summary_values = [summary.get(c, '') for c in dfp.columns]
             fh.write(','.join(str(v) for v in summary_values) + '\n')
     
     print(f"Tabla 1 guardada en: {table1_path}")
@@ -214,6 +294,10 @@ def analyze_folder(datos_path='datos/normalized', results_path='results'):
     out_lines.append('ANALYSIS SUMMARY')
     out_lines.append('================')
     out_lines.append(f'N participants: {dfp.shape[0]}')
+    out_lines.extend(dup_index.summary_lines(duplicates))
+    if min_dprime is not None:
+        out_lines.append(f'Excluded by attention check (d\' < {min_dprime}): {len(excluded)}'
+                         + (f" ({', '.join(excluded['Participant'])})" if len(excluded) else ''))
     out_lines.append('')
 
     # descriptive stats and 95% CI for each condition
@@ -306,6 +390,24 @@ def analyze_folder(datos_path='datos/normalized', results_path='results'):
         md, lo, hi, pval = paired_diff_ci(sub['Perc_S'].astype(float), sub['Perc_A'].astype(float))
         out_lines.append(f'{g} S - A: mean_diff={md:.3f}, 95% CI=[{lo:.3f}, {hi:.3f}], p_paired={pval:.4f}, n={len(sub)}')
 
+    # semantic clustering (ARC) by group; participants with undefined ARC are left out
+    arc = dfp.dropna(subset=['ARC']).groupby('Group')['ARC']
+    arc_sums = {g: (len(v), v.sum(), (v ** 2).sum()) for g, v in arc}
+    out_lines.append('')
+    out_lines.extend(arc_summary_lines(group_levels, arc_sums))
+
+    # leave-one-out influence of each participant (closed-form downdates, no refits)
+    influence = leave_one_out(dfp)
+    influence_path = results / 'influence.csv'
+    influence.to_csv(influence_path, index=False)
+    out_lines.append('')
+    out_lines.append(f'Leave-one-out influence diagnostics: {influence_path.name}')
+    if influence['dF_Interaction'].notna().any():
+        top = influence.loc[influence['dF_Interaction'].abs().idxmax()]
+        out_lines.append(f"Most influential on the interaction: {top['Participant']} "
+                         f"(F without it={top['F_Interaction_loo']:.3f}, dF={top['dF_Interaction']:.3f}, "
+                         f"p without it={top['p_Interaction_loo']:.4f})")
+
     # save analysis results
     out_path = results / 'analysis_results.txt'
     with open(out_path, 'w', encoding='utf-8') as fh:
@@ -319,13 +421,187 @@ def analyze_folder(datos_path='datos/normalized', results_path='results'):
     return 0
 
 
+def analyze_folder_streaming(datos_path='datos/normalized', results_path='results',
+                             min_dprime=None, chunk_size=5000, duplicates='drop'):
+    """
+    Out-of-core variant of analyze_folder for very large export sets.
+
+    Exports are reduced `chunk_size` files at a time to per-participant records;
+    each chunk updates the per-group sufficient statistics (suffstats) and is
+    appended to a per-group spool file, so memory does not grow with N. Table 1 is
+    then assembled from the spools, and the descriptives, paired tests and mixed
+    ANOVA are computed in closed form from the aggregates. The leave-one-out table
+    is written in a second chunked pass over Table 1.
+    """
+    stim = load_stimuli()
+    datos = Path(datos_path)
+    results = Path(results_path)
+    results.mkdir(parents=True, exist_ok=True)
+
+    sums = {}
+    arc_sums = {}
+    n_excluded = 0
+    excluded_names = []
+    columns = None
+
+    with tempfile.TemporaryDirectory(dir=results) as spool_dir:
+        spools = {}
+
+        def flush(parsed):
+            nonlocal n_excluded, columns
+            chunk = build_participant_table(parsed, len(stim['category_names']))
+            if chunk.empty:
+                return
+            if min_dprime is not None:
+                low = chunk['Att_dprime'] < min_dprime
+                n_excluded += int(low.sum())
+                excluded_names.extend(chunk.loc[low, 'Participant'].head(20 - len(excluded_names)))
+                chunk = chunk.loc[~low]
+            columns = list(chunk.columns)
+
+            for group, part in chunk.groupby('Group', sort=False):
+                complete = part.dropna(subset=['Perc_S', 'Perc_A'])
+                gs = suffstats.participant_stats(complete['Perc_S'], complete['Perc_A']).sum(axis=0)
+                sums[group] = sums.get(group, np.zeros(suffstats.N_STATS)) + gs
+                arc = part['ARC'].dropna().to_numpy(dtype=float)
+                arc_sums[group] = arc_sums.get(group, np.zeros(3)) + [arc.size, arc.sum(), (arc ** 2).sum()]
+                if group not in spools:
+                    spools[group] = open(Path(spool_dir) / f'{len(spools)}.csv', 'w', encoding='utf-8', newline='')
+                spools[group].writelines(','.join(str(v) for v in row) + '\n'
+                                         for row in part.itertuples(index=False))
+
+        n_files = 0
+        parsed = []
+        dup_index = DuplicateIndex()
+        for pid, text in iter_unique_exports(datos, duplicates, dup_index):
+            n_files += 1
+            r = read_participant(pid, text, stim)
+            if r is not None:
+                parsed.append(r)
+            if len(parsed) >= chunk_size:
+                flush(parsed)
+                parsed = []
+        flush(parsed)
+        dup_index.close()
+
+        if n_files == 0:
+            print(f"No se encontraron CSVs en {datos.resolve()}")
+            return 1
+        if not sums:
+            print("No se pudieron procesar participantes.")
+            return 1
+
+        for fh in spools.values():
+            fh.close()
+
+        group_levels = sorted(sums)
+        table1_path = results / 'table1.csv'
+        with open(table1_path, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(','.join(columns) + '\n')
+            for group in group_levels:
+                fh.write(f'\n# --- Grupo: {group} ---\n')
+                with open(spools[group].name, 'r', encoding='utf-8') as src:
+                    shutil.copyfileobj(src, fh)
+                g = sums[group]
+                summary = {'Participant': f'Group_Mean_{group}', 'Group': group,
+                           'Perc_S': f'{g[suffstats.SUM_S] / g[suffstats.N]}',
+                           'Perc_A': f'{g[suffstats.SUM_A] / g[suffstats.N]}'}
+                fh.write(','.join(str(summary.get(c, '')) for c in columns) + '\n')
+
+    group_sums = np.array([sums[g] for g in group_levels])
+    n_total = int(group_sums[:, suffstats.N].sum())
+    print(f"Tabla 1 guardada en: {table1_path}")
+    print(f"  - Total participantes procesados: {n_total}")
+    for group, g in zip(group_levels, group_sums):
+        print(f"    {group}: {int(g[suffstats.N])} participantes")
+
+    out_lines = []
+    out_lines.append('ANALYSIS SUMMARY')
+    out_lines.append('================')
+    out_lines.append(f'N participants: {n_total}')
+    out_lines.extend(dup_index.summary_lines(duplicates))
+    if min_dprime is not None:
+        out_lines.append(f'Excluded by attention check (d\' < {min_dprime}): {n_excluded}'
+                         + (f" ({', '.join(excluded_names)}{', ...' if n_excluded > len(excluded_names) else ''})"
+                            if n_excluded else ''))
+    out_lines.append('')
+
+    out_lines.append('Descriptive stats (means and 95% CI)')
+    for g, gs in zip(group_levels, group_sums):
+        for p, sx, sxx in [('S', suffstats.SUM_S, suffstats.SUM_SS), ('A', suffstats.SUM_A, suffstats.SUM_AA)]:
+            m, lo, hi = suffstats.mean_ci(gs[sx], gs[sxx], gs[suffstats.N])
+            out_lines.append(f'{g} - {p}: mean={m:.2f}, 95% CI=[{lo:.2f}, {hi:.2f}], n={int(gs[suffstats.N])}')
+    out_lines.append('')
+
+    out_lines.append('Mixed ANOVA from sufficient statistics (streaming mode; Group between, Processing within)')
+    out_lines.append(suffstats.format_anova(suffstats.mixed_anova(group_sums)))
+    out_lines.append('')
+
+    out_lines.append('Paired comparisons (S vs A) and 95% CI of the mean difference')
+    md, lo, hi, _, pval, _ = suffstats.paired_test(group_sums.sum(axis=0))
+    out_lines.append(f'Overall S - A: mean_diff={md:.3f}, 95% CI=[{lo:.3f}, {hi:.3f}], p_paired={pval:.4f}')
+    for g, gs in zip(group_levels, group_sums):
+        md, lo, hi, _, pval, n = suffstats.paired_test(gs)
+        out_lines.append(f'{g} S - A: mean_diff={md:.3f}, 95% CI=[{lo:.3f}, {hi:.3f}], p_paired={pval:.4f}, n={int(n)}')
+
+    out_lines.append('')
+    out_lines.extend(arc_summary_lines(group_levels, arc_sums))
+
+    # second pass over Table 1 for the leave-one-out table, one chunk at a time
+    influence_path = results / 'influence.csv'
+    header = True
+    top = None
+    for chunk in pd.read_csv(table1_path, comment='#', chunksize=chunk_size):
+        chunk = chunk[~chunk['Participant'].astype(str).str.startswith('Group_Mean')]
+        influence = leave_one_out(chunk, sums=group_sums, groups=group_levels)
+        influence.to_csv(influence_path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        if influence['dF_Interaction'].notna().any():
+            cand = influence.loc[influence['dF_Interaction'].abs().idxmax()]
+            if top is None or abs(cand['dF_Interaction']) > abs(top['dF_Interaction']):
+                top = cand
+    out_lines.append('')
+    out_lines.append(f'Leave-one-out influence diagnostics: {influence_path.name}')
+    if top is not None:
+        out_lines.append(f"Most influential on the interaction: {top['Participant']} "
+                         f"(F without it={top['F_Interaction_loo']:.3f}, dF={top['dF_Interaction']:.3f}, "
+                         f"p without it={top['p_Interaction_loo']:.4f})")
+
+    out_path = results / 'analysis_results.txt'
+    with open(out_path, 'w', encoding='utf-8') as fh:
+        fh.write('\n'.join(out_lines))
+
+    print(f'Análisis guardado en: {out_path}')
+    print('Resumen breve:')
+    for l in out_lines[:20]:
+        print(l)
+
+    return 0
+
+
 if __name__ == '__main__':
     import argparse
 
     p = argparse.ArgumentParser(description='Analisis de recuerdo: genera tabla y ANOVA 2x2')
-    p.add_argument('--datos', default='datos', help='Carpeta donde están los CSV (default: datos)')
+    p.add_argument('--datos', default='datos',
+                   help='Carpeta con los CSV, archivo .zip/.tar.gz o CSV .gz/.zst (default: datos)')
     p.add_argument('--out', default='results', help='Carpeta para resultados (default: results)')
+    p.add_argument('--min-dprime', type=float, default=None,
+                   help="Excluir participantes con d' de la tarea de atención menor que este umbral")
+    p.add_argument('--stream', action='store_true',
+                   help='Modo streaming: procesa los CSV por bloques con memoria acotada (para N muy grande)')
+    p.add_argument('--chunk-size', type=int, default=5000,
+                   help='Archivos por bloque en modo streaming (default: 5000)')
+    p.add_argument('--duplicates', choices=['drop', 'flag'], default='drop',
+                   help='Envíos duplicados (huella exacta o cercana): excluirlos (drop, default) '
+                        'o mantenerlos y solo reportarlos (flag)')
     args = p.parse_args()
 
-    rc = analyze_folder(datos_path=args.datos, results_path=args.out)
+    if args.stream:
+        rc = analyze_folder_streaming(datos_path=args.datos, results_path=args.out,
+                                      min_dprime=args.min_dprime, chunk_size=args.chunk_size,
+                                      duplicates=args.duplicates)
+    else:
+        rc = analyze_folder(datos_path=args.datos, results_path=args.out, min_dprime=args.min_dprime,
+                            duplicates=args.duplicates)
     sys.exit(rc)
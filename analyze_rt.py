@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+analyze_rt.py
+
+Análisis de tiempos de respuesta (TR) de la fase de estudio. Lee las columnas
+`rt_ms` (respuesta − aparición de la palabra, medido con `performance.now()`)
+y `recall_ms` (duración total del recuerdo) exportadas por `index.html`.
+
+Todas las trials de todos los participantes se apilan en arrays planos y las
+medias recortadas, medianas y cuantiles se calculan como reducciones agrupadas
+de NumPy (una ordenación + `np.bincount`), sin bucles por participante.
+También se relaciona el TR con el recuerdo posterior de cada palabra.
+
+Salida:
+- `results/rt_by_participant.csv` : TR por participante × tipo de procesamiento
+- `results/rt_results.txt` : distribuciones por condición y relación TR-recuerdo
+
+Las exportaciones antiguas sin `rt_ms` se ignoran.
+
+Dependencias: pandas, numpy, scipy
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from analyze_recall import recalled_mask
+from dedup import iter_unique_exports
+from stimuli import fold_word, load_stimuli
+
+CUES = ['S', 'A']
+TRIM = 0.1
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def _sort_by_key(keys, values, n_keys):
+    """Sort values within each key; return sorted values, group starts, counts and within-group ranks"""
+    order = np.lexsort((values, keys))
+    k = keys[order]
+    v = values[order]
+    counts = np.bincount(k, minlength=n_keys)
+    starts = np.cumsum(counts) - counts
+    ranks = np.arange(k.size) - starts[k]
+    return k, v, starts, counts, ranks
+
+
+def grouped_trimmed_mean(keys, values, n_keys, prop=TRIM):
+    """Per-key mean after cutting `prop` of the observations from each tail (as scipy.stats.trim_mean)"""
+    k, v, starts, counts, ranks = _sort_by_key(keys, values, n_keys)
+    cut = np.floor(prop * counts).astype(int)
+    keep = (ranks >= cut[k]) & (ranks < (counts - cut)[k])
+    sums = np.bincount(k[keep], weights=v[keep], minlength=n_keys)
+    n = np.bincount(k[keep], minlength=n_keys)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / n
+
+
+def grouped_quantile(keys, values, n_keys, q):
+    """Per-key quantile with linear interpolation (numpy's default method)"""
+    k, v, starts, counts, ranks = _sort_by_key(keys, values, n_keys)
+    out = np.full(n_keys, np.nan)
+    has = counts > 0
+    pos = q * (counts[has] - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.ceil(pos).astype(int)
+    frac = pos - lo
+    base = starts[has]
+    out[has] = v[base + lo] * (1 - frac) + v[base + hi] * frac
+    return out
+
+
+def grouped_median(keys, values, n_keys):
+    return grouped_quantile(keys, values, n_keys, 0.5)
+
+
+def load_trials(datos_path, stim, duplicates='drop'):
+    """
+    Stack the study trials of every export into one DataFrame:
+    Participant, Group, Cue, RT, Recalled, plus per-participant Recall_ms.
+    Cue and Recalled come from the stimulus manifest (same rule as Table 1).
+    """
+    frames = []
+    for pid, text in iter_unique_exports(datos_path, duplicates):
+        df = pd.read_csv(io.StringIO(text), dtype=str)
+        if df.empty or 'rt_ms' not in df.columns:
+            continue
+        # metadata is repeated in every row; same header fallbacks as read_participant
+        first = df.iloc[0].dropna()
+        group = first.get('group') or first.get('Group') or 'Unknown'
+        list_version = first.get('list') or first.get('List') or ''
+        if list_version not in stim['cues']:
+            continue
+
+        # manifest index of each study row; words outside the manifest are dropped below
+        item = df['word'].fillna('').map(fold_word).map(stim['norm_index']).fillna(-1).to_numpy(dtype=int)
+        known = item >= 0
+        recalled = recalled_mask(first.get('recall', ''), stim)
+
+        frames.append(pd.DataFrame({
+            'Participant': pid,
+            'Group': group,
+            'Cue': stim['cues'][list_version][item[known]],
+            'RT': pd.to_numeric(df['rt_ms'], errors='coerce').to_numpy()[known],
+            'Recalled': recalled[item[known]],
+            'Recall_ms': pd.to_numeric(first.get('recall_ms', np.nan), errors='coerce'),
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['Participant', 'Group', 'Cue', 'RT', 'Recalled', 'Recall_ms'])
+    trials = pd.concat(frames, ignore_index=True)
+    return trials.loc[trials['Cue'].isin(CUES) & trials['RT'].notna()].reset_index(drop=True)
+
+
+def analyze_rt(datos_path='datos/normalized', results_path='results', duplicates='drop'):
+    results = Path(results_path)
+    results.mkdir(parents=True, exist_ok=True)
+
+    trials = load_trials(datos_path, load_stimuli(), duplicates)
+    if trials.empty:
+        print(f"No hay tiempos de respuesta (columna rt_ms) en {Path(datos_path).resolve()}; se omite el análisis de TR.")
+        return 0
+
+    pid_codes, pids = pd.factorize(trials['Participant'], sort=True)
+    cue_codes = trials['Cue'].map({c: i for i, c in enumerate(CUES)}).to_numpy()
+    rt = trials['RT'].to_numpy(dtype=float)
+    recalled = trials['Recalled'].to_numpy(dtype=bool)
+    n_pid = len(pids)
+
+    # participant x cue reductions
+    key = pid_codes * 2 + cue_codes
+    n_keys = n_pid * 2
+    counts = np.bincount(key, minlength=n_keys)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(key, weights=rt, minlength=n_keys) / counts
+    trimmed = grouped_trimmed_mean(key, rt, n_keys)
+    medians = grouped_median(key, rt, n_keys)
+
+    # participant x cue x recalled
+    key_r = key * 2 + recalled.astype(int)
+    trimmed_r = grouped_trimmed_mean(key_r, rt, n_keys * 2).reshape(n_keys, 2)
+
+    first = trials.groupby('Participant', sort=True).first()
+    per_participant = pd.DataFrame({
+        'Participant': np.repeat(pids, 2),
+        'Group': np.repeat(first['Group'].to_numpy(), 2),
+        'Cue': CUES * n_pid,
+        'n': counts,
+        'RT_mean': means,
+        'RT_trimmed': trimmed,
+        'RT_median': medians,
+        'RT_trimmed_recalled': trimmed_r[:, 1],
+        'RT_trimmed_not_recalled': trimmed_r[:, 0],
+        'Recall_ms': np.repeat(first['Recall_ms'].to_numpy(), 2),
+    })
+    pp_path = results / 'rt_by_participant.csv'
+    per_participant.to_csv(pp_path, index=False)
+
+    out_lines = []
+    out_lines.append('RESPONSE TIME SUMMARY (study phase)')
+    out_lines.append('===================================')
+    out_lines.append(f'N participants with RT: {n_pid}, trials: {len(trials)}')
+    out_lines.append('')
+
+    # pooled distributions per group x cue
+    group_codes, groups = pd.factorize(trials['Group'], sort=True)
+    gkey = group_codes * 2 + cue_codes
+    n_gkeys = len(groups) * 2
+    gq = np.vstack([grouped_quantile(gkey, rt, n_gkeys, q) for q in QUANTILES])
+    gtrim = grouped_trimmed_mean(gkey, rt, n_gkeys)
+    gcount = np.bincount(gkey, minlength=n_gkeys)
+    out_lines.append(f'RT distribution (ms) by group and cue; trimmed mean cuts {TRIM:.0%} per tail')
+    out_lines.append('Pooled over trials; quantiles ' + ', '.join(f'q{int(q * 100)}' for q in QUANTILES))
+    for gi, g in enumerate(groups):
+        for ci, c in enumerate(CUES):
+            j = gi * 2 + ci
+            qs = ', '.join(f'{v:.0f}' for v in gq[:, j])
+            out_lines.append(f'{g} - {c}: n_trials={gcount[j]}, trimmed_mean={gtrim[j]:.1f}, quantiles=[{qs}]')
+    out_lines.append('')
+
+    # within-subject S vs A on participant medians
+    med = medians.reshape(n_pid, 2)
+    mask = ~np.isnan(med).any(axis=1)
+    if mask.sum() > 1:
+        t, p = stats.ttest_rel(med[mask, 0], med[mask, 1])
+        out_lines.append(f'Participant median RT S - A: mean_diff={np.mean(med[mask, 0] - med[mask, 1]):.1f} ms, '
+                         f't={t:.3f}, p_paired={p:.4f}, n={mask.sum()}')
+    out_lines.append('')
+
+    # RT vs later recall
+    out_lines.append('RT and later recall')
+    for ci, c in enumerate(CUES):
+        sel = cue_codes == ci
+        if sel.sum() > 2 and 0 < recalled[sel].sum() < sel.sum():
+            r, p = stats.pointbiserialr(recalled[sel], rt[sel])
+            out_lines.append(f'{c}: point-biserial r(recalled, RT)={r:.3f}, p={p:.4f}, n_trials={sel.sum()}')
+        diff = (trimmed_r[:, 1] - trimmed_r[:, 0]).reshape(n_pid, 2)[:, ci]
+        diff = diff[~np.isnan(diff)]
+        if diff.size > 1:
+            t, p = stats.ttest_1samp(diff, 0.0)
+            out_lines.append(f'{c}: trimmed RT recalled - not recalled: mean_diff={diff.mean():.1f} ms, '
+                             f't={t:.3f}, p={p:.4f}, n={diff.size}')
+
+    recall_ms = first['Recall_ms'].to_numpy(dtype=float)
+    if np.isfinite(recall_ms).any():
+        out_lines.append('')
+        out_lines.append(f'Recall phase duration: median={np.nanmedian(recall_ms) / 1000:.1f} s, '
+                         f'mean={np.nanmean(recall_ms) / 1000:.1f} s')
+
+    out_path = results / 'rt_results.txt'
+    with open(out_path, 'w', encoding='utf-8') as fh:
+        fh.write('\n'.join(out_lines))
+
+    print(f'TR por participante guardado en: {pp_path}')
+    print(f'Análisis de TR guardado en: {out_path}')
+    return 0
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser(description='Análisis de tiempos de respuesta de la fase de estudio')
+    p.add_argument('--datos', default='datos/normalized',
+                   help='Carpeta con los CSV o archivo .zip/.tar.gz (default: datos/normalized)')
+    p.add_argument('--out', default='results', help='Carpeta para resultados (default: results)')
+    p.add_argument('--duplicates', choices=['drop', 'flag'], default='drop',
+                   help='Envíos duplicados (huella exacta o cercana): excluirlos (drop, default) '
+                        'o mantenerlos y solo reportarlos (flag)')
+    args = p.parse_args()
+
+    sys.exit(analyze_rt(datos_path=args.datos, results_path=args.out, duplicates=args.duplicates))
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+archive_io.py
+
+Lectura de las exportaciones CSV sin descomprimirlas a disco. `iter_exports()`
+acepta:
+
+- una carpeta con `*.csv`, `*.csv.gz` o `*.csv.zst`
+- un archivo `.zip` o `.tar`, `.tar.gz`/`.tgz`, `.tar.bz2`, `.tar.xz`
+- un único `.csv`, `.csv.gz` o `.csv.zst`
+
+y devuelve `(id, texto)` por cada CSV, uno a la vez, con memoria acotada. El id
+es la ruta del CSV relativa a la raíz del archivo sin extensión (en una carpeta,
+el nombre sin extensión), así que `cohA/p1.csv` y `cohB/p1.csv` no se confunden.
+
+`ExportWriter` escribe las salidas en una carpeta o, si la ruta termina en
+`.zip` o `.tar`/`.tar.gz`/`.tgz`/`.tar.bz2`/`.tar.xz`, directamente en un
+archivo comprimido; otras extensiones de archivo comprimido son un error. Como
+las carpetas se leen sin recursión, en una carpeta de salida las subcarpetas se
+aplanan en el nombre (`cohA/p1.csv` -> `cohA__p1.csv`) y al cerrar se comprueba
+que todo lo escrito vuelve a leerse con `iter_exports()`.
+
+zstd requiere el paquete opcional `zstandard` (`pip install zstandard`).
+"""
+
+import csv
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except Exception:
+    zstandard = None  # type: ignore
+    HAS_ZSTD = False
+
+CSV_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+TAR_WRITE_MODES = {'.tar': 'w', '.tar.gz': 'w:gz', '.tgz': 'w:gz', '.tar.bz2': 'w:bz2', '.tar.xz': 'w:xz'}
+# file-like outputs ExportWriter cannot produce (it writes folders, .zip and .tar.*)
+UNWRITABLE_SUFFIXES = ('.gz', '.zst', '.bz2', '.xz', '.7z', '.rar', '.csv')
+# replaces '/' in member paths written to a folder (folders are read non-recursively)
+FLAT_SEP = '__'
+
+
+def decode(raw):
+    """CSV bytes -> text (UTF-8 with optional BOM, latin-1 fallback)"""
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def _lower(path):
+    return str(path).lower()
+
+
+def is_export_name(name):
+    return _lower(name).endswith(CSV_SUFFIXES)
+
+
+def export_id(name):
+    """
+    Participant id of an export: its path relative to the folder/archive root
+    without the CSV suffix ('cohA/datos (1).csv.gz' -> 'cohA/datos (1)'), so equal
+    file names in different sub-folders stay distinct
+    """
+    rel = str(name).replace('\\', '/')
+    while rel.startswith('./'):
+        rel = rel[2:]
+    rel = rel.lstrip('/')
+    for suffix in sorted(CSV_SUFFIXES, key=len, reverse=True):
+        if rel.lower().endswith(suffix):
+            return rel[:-len(suffix)]
+    return str(PurePosixPath(rel).with_suffix(''))
+
+
+def first_row(text):
+    """First data row of a CSV export as a dict (None if it has no rows)"""
+    # plain csv module: a single-row pd.read_csv is dominated by parser setup cost
+    return next(csv.DictReader(io.StringIO(text)), None)
+
+
+def decompress(name, raw):
+    """Undo the per-file compression implied by the file name"""
+    low = _lower(name)
+    if low.endswith('.gz'):
+        return gzip.decompress(raw)
+    if low.endswith('.zst'):
+        if not HAS_ZSTD:
+            raise RuntimeError(f"{name}: se necesita el paquete 'zstandard' para leer .zst")
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(raw)).read()
+    return raw
+
+
+def is_archive(path):
+    low = _lower(path)
+    return low.endswith('.zip') or low.endswith(TAR_SUFFIXES)
+
+
+# Members are read one at a time from a single handle: a thread pool was slower
+# for folders and zips (the work is mostly GIL-bound decoding) and, with one
+# ZipFile per thread, held the zip central directory once per worker.
+
+def _dir_export_names(path):
+    """Sorted export file names at the top level of a folder (sub-folders are not read)"""
+    # plain name strings keep the listing small for very large folders
+    with os.scandir(path) as it:
+        return sorted(e.name for e in it if e.is_file() and is_export_name(e.name))
+
+
+def _iter_dir(path):
+    for name in _dir_export_names(path):
+        yield export_id(name), decode(decompress(name, (Path(path) / name).read_bytes()))
+
+
+def _iter_zip(path):
+    with zipfile.ZipFile(path) as zf:
+        infos = sorted((i for i in zf.infolist() if not i.is_dir() and is_export_name(i.filename)),
+                       key=lambda i: i.filename)
+        for info in infos:
+            yield export_id(info.filename), decode(decompress(info.filename, zf.read(info)))
+
+
+def _iter_tar(path):
+    # tar streams are sequential: read members in archive order
+    with tarfile.open(path, mode='r:*') as tf:
+        for member in tf:
+            if member.isfile() and is_export_name(member.name):
+                yield export_id(member.name), decode(decompress(member.name, tf.extractfile(member).read()))
+            # drop the member list tarfile keeps, so memory does not grow with N
+            tf.members = []
+
+
+def iter_exports(path):
+    """
+    Yield (participant_id, csv_text) for every export under `path`
+    (folder, .zip/.tar.* archive or single, possibly compressed, CSV)
+    """
+    path = Path(path)
+    if path.is_dir():
+        yield from _iter_dir(path)
+    elif _lower(path).endswith('.zip'):
+        yield from _iter_zip(path)
+    elif _lower(path).endswith(TAR_SUFFIXES):
+        yield from _iter_tar(path)
+    elif path.is_file() and is_export_name(path.name):
+        yield export_id(path.name), decode(decompress(path.name, path.read_bytes()))
+
+
+class ExportWriter:
+    """
+    Write named CSV texts into a folder, a .zip or a .tar.* (chosen from the path).
+    In a folder, member paths are flattened ('cohA/p1.csv' -> 'cohA__p1.csv').
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        low = _lower(self.path)
+        self._zip = None
+        self._tar = None
+        self._names = set()
+        tar_suffix = next((sfx for sfx in sorted(TAR_WRITE_MODES, key=len, reverse=True) if low.endswith(sfx)), None)
+        if low.endswith('.zip'):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._zip = zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_DEFLATED)
+        elif tar_suffix is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._tar = tarfile.open(self.path, TAR_WRITE_MODES[tar_suffix])
+        elif low.endswith(UNWRITABLE_SUFFIXES):
+            raise ValueError(f"{self.path}: formato de salida no soportado "
+                             f"(use una carpeta, .zip o {', '.join(TAR_WRITE_MODES)})")
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def _member_name(self, filename):
+        if self._zip is not None or self._tar is not None:
+            return filename
+        return filename.replace('\\', '/').replace('/', FLAT_SEP)
+
+    def target(self, filename):
+        """Human-readable location of `filename` inside the output"""
+        filename = self._member_name(filename)
+        if self._zip is not None or self._tar is not None:
+            return f'{self.path}:{filename}'
+        return str(self.path / filename)
+
+    def write(self, filename, text):
+        filename = self._member_name(filename)
+        if filename in self._names:
+            raise ValueError(f'{self.target(filename)}: ya se escribió un archivo con ese nombre')
+        self._names.add(filename)
+        data = text.encode('utf-8')
+        if self._zip is not None:
+            self._zip.writestr(filename, data)
+        elif self._tar is not None:
+            info = tarfile.TarInfo(filename)
+            info.size = len(data)
+            self._tar.addfile(info, io.BytesIO(data))
+        else:
+            (self.path / filename).write_bytes(data)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        elif self._tar is not None:
+            self._tar.close()
+        else:
+            # round trip: every export written must be listed by iter_exports()
+            unread = {n for n in self._names if is_export_name(n)} - set(_dir_export_names(self.path))
+            if unread:
+                raise RuntimeError(f'{self.path}: {len(unread)} archivos escritos no se leerían '
+                                   f'(p. ej. {sorted(unread)[0]})')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
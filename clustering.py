@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+clustering.py
+
+Medidas de organización del recuerdo calculadas para todos los participantes a
+la vez sobre secuencias rellenadas (matriz participante × posición de salida,
+-1 = relleno).
+
+- `pad_sequences()` : lista de secuencias -> matriz rellenada
+- `arc_scores()` : Adjusted Ratio of Clustering (Roenker, Thompson y Brown,
+  1971) a partir de las categorías semánticas de `stimuli.json`, en el orden en
+  que se escribieron las palabras. Las palabras sin categoría se descartan antes
+  de contar repeticiones.
+
+    ARC = (R − E[R]) / (max R − E[R])
+    R = pares consecutivos de la misma categoría
+    E[R] = Σ m_i² / n − 1,  max R = n − k
+    (n palabras categorizadas recordadas, k categorías recordadas, m_i por categoría)
+
+ARC vale 1 con agrupamiento perfecto y ~0 con orden aleatorio; queda indefinido
+(NaN) cuando max R = E[R], p. ej. con menos de dos palabras o una por categoría.
+"""
+
+import numpy as np
+
+
+def pad_sequences(seqs):
+    """List of int sequences -> (P, max_len) int array padded with -1"""
+    width = max((len(s) for s in seqs), default=0)
+    out = np.full((len(seqs), max(width, 1)), -1, dtype=np.int64)
+    lengths = np.fromiter((len(s) for s in seqs), dtype=np.int64, count=len(seqs))
+    rows = np.repeat(np.arange(len(seqs)), lengths)
+    cols = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    out[rows, cols] = np.fromiter((p for s in seqs for p in s), dtype=np.int64, count=rows.size)
+    return out
+
+
+def arc_scores(category_seqs, n_categories):
+    """
+    ARC per participant.
+
+    category_seqs: list of category-code sequences in output order, uncategorized
+    items already removed (codes 0..n_categories-1)
+    Returns a DataFrame-ready dict of arrays: ARC, ARC_R (observed repetitions),
+    ARC_n (categorized words recalled), ARC_k (categories recalled).
+    """
+    cat = pad_sequences(category_seqs)
+    n_p = len(cat)
+    valid = cat >= 0
+
+    repeats = ((cat[:, 1:] == cat[:, :-1]) & valid[:, 1:]).sum(axis=1)
+    n = valid.sum(axis=1)
+
+    key = (np.arange(n_p)[:, None] * n_categories + cat)[valid]
+    m = np.bincount(key, minlength=n_p * max(n_categories, 1)).reshape(n_p, max(n_categories, 1))
+    k = (m > 0).sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        expected = (m ** 2).sum(axis=1) / n - 1
+        max_r = n - k
+        arc = (repeats - expected) / (max_r - expected)
+    arc = np.where(np.isclose(max_r, expected) | (n < 2), np.nan, arc)
+    return {'ARC': arc, 'ARC_R': repeats, 'ARC_n': n, 'ARC_k': k}
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+dedup.py
+
+Detección de envíos duplicados. El navegador a veces descarga la misma
+exportación dos veces ("datos_parcipante_N (8)" junto a "(7)"), y cada archivo
+se contaría como un participante distinto, inflando N y sesgando la ANOVA.
+
+Cada exportación recibe dos huellas, ambas sin parsear el CSV:
+
+- exacta: SHA-256 del texto CSV
+- cercana: SHA-256 del texto plegado a ASCII en minúsculas y sin nada que no
+  sea letra o dígito, de modo que cambios de codificación, saltos de línea,
+  comillas, espacios, puntuación, mayúsculas o tildes (en trials, datos
+  demográficos o recuerdo) no ocultan un duplicado
+
+El índice huella → participante vive en una base SQLite temporal en disco
+(clave primaria, búsqueda indexada por archivo), así que la memoria no crece con
+N en el modo streaming; se borra al cerrar el índice.
+
+Todas las etapas (`analyze_recall`, `analyze_rt`, `analyze_order`,
+`score_attention`) leen las exportaciones con `iter_unique_exports()`, así que
+la opción `--duplicates` (`drop` o `flag`) deja el mismo N en todas.
+
+Uso:
+    for pid, text in iter_unique_exports('datos/normalized', duplicates='drop'):
+        ...
+    with DuplicateIndex() as index:
+        dup = index.check(pid, text)   # None o ('exact'|'near', participante original)
+"""
+
+import hashlib
+import sqlite3
+import string
+import unicodedata
+
+from archive_io import iter_exports
+
+# bytes removed from the lowercased ASCII text to build the near fingerprint
+_NON_ALNUM = bytes(c for c in range(256) if chr(c) not in string.ascii_lowercase + string.digits)
+KEEP_LISTED = 20
+DUPLICATE_ACTIONS = ('drop', 'flag')
+
+
+def exact_fingerprint(text):
+    return hashlib.sha256(text.encode('utf-8')).digest()[:16]
+
+
+def near_fingerprint(text):
+    """Hash of the export with case, accents and every non-alphanumeric character removed"""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return hashlib.sha256(text.lower().encode('ascii').translate(None, _NON_ALNUM)).digest()[:16]
+
+
+class DuplicateIndex:
+    """
+    First-seen owner of every exact and near fingerprint in the current run,
+    kept in a private on-disk SQLite table
+    """
+
+    def __init__(self, keep_listed=KEEP_LISTED):
+        # '' = private temporary on-disk database, deleted when the connection closes
+        self._db = sqlite3.connect('', isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=OFF')
+        self._db.execute('PRAGMA synchronous=OFF')
+        self._db.execute('CREATE TABLE owners (fp BLOB PRIMARY KEY, pid TEXT) WITHOUT ROWID')
+        self._keep_listed = keep_listed
+        self.n_exact = 0
+        self.n_near = 0
+        self.duplicates = []  # first `keep_listed` (pid, kind, original)
+
+    def check(self, pid, text):
+        """
+        Register one export. Returns None for a new submission, or (kind, original)
+        when it repeats an export already seen in this run.
+        """
+        exact = b'e' + exact_fingerprint(text)
+        near = b'n' + near_fingerprint(text)
+        rows = dict(self._db.execute('SELECT fp, pid FROM owners WHERE fp IN (?, ?)', (exact, near)).fetchall())
+        for kind, fp in (('exact', exact), ('near', near)):
+            original = rows.get(fp)
+            if original is not None:
+                if kind == 'exact':
+                    self.n_exact += 1
+                else:
+                    self.n_near += 1
+                if len(self.duplicates) < self._keep_listed:
+                    self.duplicates.append((pid, kind, original))
+                return kind, original
+
+        self._db.executemany('INSERT INTO owners VALUES (?, ?)', ((exact, pid), (near, pid)))
+        return None
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary_lines(self, action):
+        """Lines for analysis_results.txt describing the duplicates found"""
+        total = self.n_exact + self.n_near
+        if not total:
+            return ['Duplicate submissions: none']
+        verb = 'dropped' if action == 'drop' else 'kept and flagged'
+        lines = [f'Duplicate submissions ({verb}): {total} (exact: {self.n_exact}, near: {self.n_near})']
+        for pid, kind, original in self.duplicates:
+            lines.append(f'  {pid} = {original} ({kind})')
+        if total > len(self.duplicates):
+            lines.append(f'  ... {total - len(self.duplicates)} more')
+        return lines
+
+
+def iter_unique_exports(path, duplicates='drop', index=None):
+    """
+    Yield (participant_id, csv_text) like archive_io.iter_exports, skipping repeated
+    submissions when duplicates == 'drop' ('flag' keeps them and only reports them).
+    Pass `index` to read its counters afterwards; otherwise a private one is used.
+    """
+    if duplicates not in DUPLICATE_ACTIONS:
+        raise ValueError(f"duplicates debe ser uno de {DUPLICATE_ACTIONS}, no {duplicates!r}")
+    own = index is None
+    if own:
+        index = DuplicateIndex()
+    try:
+        for pid, text in iter_exports(path):
+            dup = index.check(pid, text)
+            if dup is not None:
+                # only the listed ones are printed, so huge re-download sets do not flood the log
+                if index.n_exact + index.n_near <= index._keep_listed:
+                    print(f"Archivo {pid}: duplicado ({dup[0]}) de {dup[1]}" + (". Skipping." if duplicates == 'drop' else ''))
+                if duplicates == 'drop':
+                    continue
+            yield pid, text
+    finally:
+        if own:
+            index.close()
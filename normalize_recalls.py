@@ -4,20 +4,30 @@ Normalize recall fields in CSVs under datos/.
 - Uppercases recall tokens
 - Replaces commas and other separators with a homogeneous separator `;`
 - Keeps only words that are in the allowed list (exact match after normalization)
-- Writes output CSVs as `normalized_<original>.csv` in the same folder
+- Writes output CSVs with the original file name under `datos/normalized/`
+  (archive sub-folders are flattened into the name: `cohA/p1.csv` -> `cohA__p1.csv`)
+
+Input can also be a .zip/.tar.gz archive of exports or a .csv.gz/.csv.zst file,
+read without extracting; output can be written into a .zip/.tar.gz instead of
+a folder.
 
 Run:
   python scripts\normalize_recalls.py
+  python normalize_recalls.py cohorte1.zip --out datos/normalized/cohorte1.zip
 
 The script is idempotent and can be re-run when new files are added.
 """
 import csv
+import io
 import os
 import re
 import sys
 import unicodedata
 import difflib
 
+from archive_io import ExportWriter, iter_exports
+from stimuli import load_stimuli
+
 BASE = os.path.dirname(__file__)
 DATOS_DIR = os.path.join(BASE, 'datos')
 SEPARATOR = ';'
@@ -26,13 +36,8 @@ OUT_DIR = os.path.join(DATOS_DIR, 'normalized')
 # use single space as homogeneous separator for readability
 SEPARATOR = ' '
 
-# Allowed words (exact uppercase tokens expected)
-ALLOWED_WORDS = [
-  "HUESO","MIEL","RINOCERONTE","CAMA","TORNADO","SOL","TANQUE","VINO",
-  "MOSCA","LENTEJAS","FRIO","ELEFANTE","CHOCOLATE","PAZ","PRECIPICIO",
-  "BIKINI","MAR","COCODRILO","BUITRE","IGLESIA","VOLCAN","AVISPA","FLOR",
-  "ZAPATO","DELFIN","ENSALADA","TERREMOTO","GUSANO","FRESA","DESIERTO"
-]
+# Allowed words (exact uppercase tokens expected), from the shared stimulus manifest
+ALLOWED_WORDS = list(load_stimuli()['words'])
 ALLOWED_SET = set(ALLOWED_WORDS)
 
 # helpers
@@ -72,24 +77,19 @@ def split_recall_field(text: str):
     return parts
 
 
-def process_file(path: str):
-    filename = os.path.basename(path)
-    out_path = os.path.join(os.path.dirname(path), f'normalized_{filename}')
-    # write normalized files into dedicated folder so originals remain untouched
-    if not os.path.isdir(OUT_DIR):
-        os.makedirs(OUT_DIR, exist_ok=True)
-    out_path = os.path.join(OUT_DIR, filename)
+def process_file(name: str, text: str, writer: ExportWriter):
+    """Normalize the recall field of one export (name without extension, CSV text)"""
+    filename = f'{name}.csv'
+    # write normalized files into dedicated folder/archive so originals remain untouched
+    print(f'Processing {filename} -> {writer.target(filename)}')
 
-    print(f'Processing {filename} -> {os.path.relpath(out_path)}')
-
-    with open(path, 'r', encoding='utf-8', newline='') as f_in:
-        # try to detect delimiter as comma by default
-        reader = csv.DictReader(f_in)
-        if 'recall' not in reader.fieldnames:
-            print(f'  Warning: file {filename} has no "recall" column. Skipping.')
-            return
-        rows = list(reader)
-        fieldnames = reader.fieldnames
+    # try to detect delimiter as comma by default
+    reader = csv.DictReader(io.StringIO(text, newline=''))
+    if not reader.fieldnames or 'recall' not in reader.fieldnames:
+        print(f'  Warning: file {filename} has no "recall" column. Skipping.')
+        return
+    rows = list(reader)
+    fieldnames = reader.fieldnames
 
     total_rows = len(rows)
     total_accepted = 0
@@ -131,33 +131,48 @@ def process_file(path: str):
         row['recall'] = SEPARATOR.join(normalized)
 
     # write output
-    with open(out_path, 'w', encoding='utf-8', newline='') as f_out:
-        writer = csv.DictWriter(f_out, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+    out = io.StringIO(newline='')
+    csv_writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction='ignore')
+    csv_writer.writeheader()
+    for row in rows:
+        csv_writer.writerow(row)
+    writer.write(filename, out.getvalue())
 
     print(f'  Rows: {total_rows}, tokens kept: {total_accepted}, fuzzy-replaced: {total_fuzzy}, kept-unmatched: {total_kept_unmatched}, previously-removed: {total_removed}')
 
 
-def main():
-    if not os.path.isdir(DATOS_DIR):
-        print(f'Datos directory not found: {DATOS_DIR}')
+def main(src=None, out=None):
+    src = src or DATOS_DIR
+    out = out or OUT_DIR
+    if not os.path.exists(src):
+        print(f'Datos directory not found: {src}')
         sys.exit(1)
 
-    files = [os.path.join(DATOS_DIR, n) for n in os.listdir(DATOS_DIR) if n.lower().endswith('.csv')]
-    if not files:
-        print('No CSV files found in datos/ folder.')
+    n_files = 0
+    with ExportWriter(out) as writer:
+        # exports are streamed straight from folders or archives (no extraction)
+        for name, text in iter_exports(src):
+            n_files += 1
+            try:
+                process_file(name, text, writer)
+            except Exception as e:
+                print(f'Error processing {name}: {e}')
+
+    if n_files == 0:
+        print(f'No CSV files found in {src}.')
         return
 
-    for p in files:
-        try:
-            process_file(p)
-        except Exception as e:
-            print(f'Error processing {p}: {e}')
-
     print('Done.')
 
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    p = argparse.ArgumentParser(description='Normaliza el campo recall de las exportaciones')
+    p.add_argument('src', nargs='?', default=DATOS_DIR,
+                   help='Carpeta, archivo .zip/.tar.gz o CSV .gz/.zst con las exportaciones (default: datos/)')
+    p.add_argument('--out', default=OUT_DIR,
+                   help='Carpeta de salida, o archivo .zip/.tar.gz para escribir comprimido (default: datos/normalized)')
+    args = p.parse_args()
+
+    main(src=args.src, out=args.out)
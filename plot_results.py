@@ -10,11 +10,18 @@ Salida:
 - `results/plot_interaction.png` — Gráfico de interacción (líneas)
 - `results/plot_distributions.png` — Distribuciones por grupo
 - `results/plot_boxplot.png` — Diagramas de caja por condición
+- `results/plot_paired_comparison.png` — Comparación pareada S vs A
+
+Con `--format html` los cinco gráficos se generan como SVG vectorial (sin
+rasterizar) y se incrustan, junto con la Tabla 1 y la tabla del ANOVA, en un
+único fichero autocontenido `results/report.html`.
 
 Dependencias: pandas, numpy, matplotlib, seaborn, scipy
 Instalación: `pip install pandas numpy scipy matplotlib seaborn`
 """
 
+import html
+import io
 import sys
 from pathlib import Path
 
@@ -33,6 +40,49 @@ plt.rcParams['font.size'] = 11
 plt.rcParams['axes.labelsize'] = 12
 plt.rcParams['axes.titlesize'] = 14
 plt.rcParams['legend.fontsize'] = 10
+# keep SVG output compact and reproducible: text stays as <text> instead of
+# glyph paths and element ids do not change between runs
+plt.rcParams['svg.fonttype'] = 'none'
+plt.rcParams['svg.hashsalt'] = 'pec-uned'
+
+
+def _save_figure(fig, results_path, name, fmt='png'):
+    """
+    Save `fig` as a 300-dpi PNG (fmt='png') or return it as inline SVG markup (fmt='svg')
+    """
+    if fmt == 'svg':
+        buf = io.StringIO()
+        fig.savefig(buf, format='svg', bbox_inches='tight', metadata={'Date': None})
+        plt.close(fig)
+        svg = buf.getvalue()
+        # drop the XML prolog/doctype so the markup can be embedded in HTML
+        return svg[svg.index('<svg'):]
+
+    out_path = Path(results_path) / f'{name}.png'
+    fig.savefig(out_path, dpi=300, bbox_inches='tight')
+    print(f"Gráfico guardado: {out_path}")
+    plt.close(fig)
+    return out_path
+
+
+# Above this many participants the per-participant artists (violin KDEs over raw
+# scores, strip points, one bar pair per participant) are replaced by binned
+# aggregates whose drawing cost does not depend on N.
+LARGE_N_THRESHOLD = 300
+# one bin per possible score of a 15-word cue list (0, 6.67, ..., 100), so the
+# bins never alias against the scoring grain
+SCORE_BINS = np.linspace(-100 / 30, 100 + 100 / 30, 17)
+
+
+def _is_large_n(n, large_n, threshold=LARGE_N_THRESHOLD):
+    return n > threshold if large_n is None else bool(large_n)
+
+
+def _binned_density(values, bins=SCORE_BINS):
+    """Histogram counts of the non-missing values (one np.histogram call)"""
+    values = np.asarray(values, dtype=float)
+    counts, _ = np.histogram(values[~np.isnan(values)], bins=bins)
+    return counts
 
 
 def load_data(table1_path='results/table1.csv'):
@@ -68,7 +118,7 @@ def load_data(table1_path='results/table1.csv'):
     return df, long
 
 
-def plot_means_by_condition(long, results_path='results'):
+def plot_means_by_condition(long, results_path='results', fmt='png'):
     """
     Plot means and 95% CI by condition (Group × Processing)
     """
@@ -129,13 +179,10 @@ def plot_means_by_condition(long, results_path='results'):
     ax.legend(handles=legend_elements, loc='upper right')
     
     plt.tight_layout()
-    out_path = Path(results_path) / 'plot_means_by_condition.png'
-    plt.savefig(out_path, dpi=300, bbox_inches='tight')
-    print(f"Gráfico guardado: {out_path}")
-    plt.close()
+    return _save_figure(fig, results_path, 'plot_means_by_condition', fmt)
 
 
-def plot_interaction(long, results_path='results'):
+def plot_interaction(long, results_path='results', fmt='png'):
     """
     Plot interaction effect (lines for each group, x-axis = Processing)
     """
@@ -168,55 +215,121 @@ def plot_interaction(long, results_path='results'):
     ax.legend(fontsize=11, loc='best')
     
     plt.tight_layout()
-    out_path = Path(results_path) / 'plot_interaction.png'
-    plt.savefig(out_path, dpi=300, bbox_inches='tight')
-    print(f"Gráfico guardado: {out_path}")
-    plt.close()
+    return _save_figure(fig, results_path, 'plot_interaction', fmt)
+
+
+def _plot_binned_violins(long, ax):
+    """
+    Large-N replacement for the violin plot: mirrored step histograms per group x processing
+    """
+    groups = sorted(long['Group'].unique())
+    palette = {'S': '#FFB3BA', 'A': '#BAE1FF'}
+    offsets = {'S': -0.2, 'A': 0.2}
+    edges = np.repeat(SCORE_BINS, 2)[1:-1]
+
+    for gi, g in enumerate(groups):
+        for p in ['S', 'A']:
+            counts = _binned_density(long.loc[(long['Group'] == g) & (long['Processing'] == p), 'Score'])
+            if counts.max() == 0:
+                continue
+            half = 0.18 * np.repeat(counts / counts.max(), 2)
+            center = gi + offsets[p]
+            ax.fill_betweenx(edges, center - half, center + half, color=palette[p],
+                             edgecolor='black', linewidth=0.8,
+                             label=p if gi == 0 else None)
 
+    ax.set_xticks(range(len(groups)))
+    ax.set_xticklabels(groups)
 
-def plot_distributions(long, results_path='results'):
+
+def plot_distributions(long, results_path='results', fmt='png', large_n=None):
     """
-    Plot distributions (violin plots) by group and processing
+    Plot distributions (violin plots) by group and processing.
+    With many participants (see LARGE_N_THRESHOLD) binned densities are drawn instead.
     """
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    # Create violin plot
-    sns.violinplot(data=long, x='Group', y='Score', hue='Processing',
-                   ax=ax, palette={'S': '#FFB3BA', 'A': '#BAE1FF'},
-                   inner='box', cut=0)
+    if _is_large_n(long['Participant'].nunique(), large_n):
+        _plot_binned_violins(long, ax)
+        subtitle = 'Densidades agrupadas en intervalos'
+    else:
+        # Create violin plot
+        sns.violinplot(data=long, x='Group', y='Score', hue='Processing',
+                       ax=ax, palette={'S': '#FFB3BA', 'A': '#BAE1FF'},
+                       inner='box', cut=0)
+        subtitle = 'Violin Plots'
     
     ax.set_xlabel('Grupo', fontsize=12, fontweight='bold')
     ax.set_ylabel('% Recuerdo', fontsize=12, fontweight='bold')
-    ax.set_title('Distribuciones de Recuerdo por Grupo y Procesamiento\n(Violin Plots)', 
+    ax.set_title(f'Distribuciones de Recuerdo por Grupo y Procesamiento\n({subtitle})', 
                  fontsize=14, fontweight='bold')
     ax.set_ylim(0, 100)
     ax.legend(title='Procesamiento', fontsize=10, title_fontsize=11)
     ax.grid(axis='y', alpha=0.3)
     
     plt.tight_layout()
-    out_path = Path(results_path) / 'plot_distributions.png'
-    plt.savefig(out_path, dpi=300, bbox_inches='tight')
-    print(f"Gráfico guardado: {out_path}")
-    plt.close()
+    return _save_figure(fig, results_path, 'plot_distributions', fmt)
+
+
+def _plot_binned_boxes(data, ax, colors):
+    """
+    Large-N replacement for boxplot + stripplot: boxes from precomputed quantiles
+    (no flier artists) and one scatter per condition sized by the binned counts
+    """
+    centers = (SCORE_BINS[:-1] + SCORE_BINS[1:]) / 2
+    box_stats = []
+    for p in ['S', 'A']:
+        x = data.loc[data['Processing'] == p, 'Score'].dropna().to_numpy(dtype=float)
+        if x.size == 0:
+            box_stats.append({'med': np.nan, 'q1': np.nan, 'q3': np.nan,
+                              'whislo': np.nan, 'whishi': np.nan, 'fliers': []})
+            continue
+        q1, med, q3 = np.percentile(x, [25, 50, 75])
+        iqr = q3 - q1
+        box_stats.append({
+            'med': med, 'q1': q1, 'q3': q3,
+            'whislo': x[x >= q1 - 1.5 * iqr].min(),
+            'whishi': x[x <= q3 + 1.5 * iqr].max(),
+            'fliers': [],
+        })
 
+    bp = ax.bxp(box_stats, positions=[0, 1], widths=0.6, patch_artist=True, showfliers=False)
+    for patch, p in zip(bp['boxes'], ['S', 'A']):
+        patch.set_facecolor(colors[p])
 
-def plot_boxplots(long, results_path='results'):
+    for pos, p in enumerate(['S', 'A']):
+        counts = _binned_density(data.loc[data['Processing'] == p, 'Score'])
+        keep = counts > 0
+        if keep.any():
+            ax.scatter(np.full(keep.sum(), pos + 0.38), centers[keep],
+                       s=200 * counts[keep] / counts.max(), color='black', alpha=0.4)
+
+    ax.set_xticks([0, 1])
+    ax.set_xlim(-0.6, 1.6)
+
+
+def plot_boxplots(long, results_path='results', fmt='png', large_n=None):
     """
-    Plot boxplots (caja y bigotes) for each condition
+    Plot boxplots (caja y bigotes) for each condition.
+    With many participants the individual points are replaced by binned counts.
     """
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     
     groups = sorted(long['Group'].unique())
     colors = {'S': '#FFB3BA', 'A': '#BAE1FF'}
+    large = _is_large_n(long['Participant'].nunique(), large_n)
     
     for idx, g in enumerate(groups):
         data = long.loc[long['Group'] == g]
         
-        # Box plot by processing
-        sns.boxplot(data=data, x='Processing', y='Score', hue='Processing', ax=axes[idx],
-                   palette=colors, width=0.6, legend=False)
-        sns.stripplot(data=data, x='Processing', y='Score', ax=axes[idx],
-                     color='black', alpha=0.4, size=8, jitter=True)
+        if large:
+            _plot_binned_boxes(data, axes[idx], colors)
+        else:
+            # Box plot by processing
+            sns.boxplot(data=data, x='Processing', y='Score', hue='Processing', ax=axes[idx],
+                       palette=colors, width=0.6, legend=False)
+            sns.stripplot(data=data, x='Processing', y='Score', ax=axes[idx],
+                         color='black', alpha=0.4, size=8, jitter=True)
         
         axes[idx].set_xlabel('Nivel de Procesamiento', fontsize=11, fontweight='bold')
         axes[idx].set_ylabel('% Recuerdo', fontsize=11, fontweight='bold')
@@ -228,19 +341,51 @@ def plot_boxplots(long, results_path='results'):
         axes[idx].set_ylim(0, 100)
         axes[idx].grid(axis='y', alpha=0.3)
     
-    plt.suptitle('Diagramas de Caja por Grupo\n(Mediana, cuartiles y datos individuales)',
+    detail = 'datos agrupados en intervalos' if large else 'datos individuales'
+    plt.suptitle(f'Diagramas de Caja por Grupo\n(Mediana, cuartiles y {detail})',
                  fontsize=14, fontweight='bold', y=1.00)
     plt.tight_layout()
-    out_path = Path(results_path) / 'plot_boxplot.png'
-    plt.savefig(out_path, dpi=300, bbox_inches='tight')
-    print(f"Gráfico guardado: {out_path}")
-    plt.close()
+    return _save_figure(fig, results_path, 'plot_boxplot', fmt)
 
 
-def plot_paired_comparison(df, results_path='results'):
+def _plot_paired_density(df, results_path, fmt):
     """
-    Plot paired comparison: S vs A for each participant
+    Large-N replacement for the per-participant bars: binned S-vs-A 2D density per group
     """
+    groups = sorted(df['Group'].unique())
+    fig, axes = plt.subplots(1, len(groups), figsize=(7 * len(groups), 6), squeeze=False)
+    axes = axes[0]
+
+    for ax, g in zip(axes, groups):
+        sub = df.loc[df['Group'] == g, ['Perc_S', 'Perc_A']].dropna()
+        counts, _, _ = np.histogram2d(sub['Perc_S'], sub['Perc_A'], bins=[SCORE_BINS, SCORE_BINS])
+        mesh = ax.pcolormesh(SCORE_BINS, SCORE_BINS, np.ma.masked_equal(counts.T, 0), cmap='viridis')
+        fig.colorbar(mesh, ax=ax, label='Participantes')
+        ax.plot([0, 100], [0, 100], color='black', linestyle='--', linewidth=1)
+
+        diff = (sub['Perc_S'] - sub['Perc_A']).to_numpy()
+        ax.set_title(f'Grupo: {g} (n={len(sub)}, media S-A={diff.mean():.1f})',
+                     fontsize=12, fontweight='bold')
+        ax.set_xlabel('Superficial (S) % Recuerdo', fontsize=11, fontweight='bold')
+        ax.set_ylabel('Profundo (A) % Recuerdo', fontsize=11, fontweight='bold')
+        ax.set_xlim(0, 100)
+        ax.set_ylim(0, 100)
+        ax.set_aspect('equal')
+
+    plt.suptitle('Comparación Pareada: Procesamiento Superficial vs Profundo\n(Densidad S vs A; diagonal = sin diferencia)',
+                 fontsize=14, fontweight='bold', y=1.00)
+    plt.tight_layout()
+    return _save_figure(fig, results_path, 'plot_paired_comparison', fmt)
+
+
+def plot_paired_comparison(df, results_path='results', fmt='png', large_n=None):
+    """
+    Plot paired comparison: S vs A for each participant.
+    With many participants a binned S-vs-A density per group is drawn instead.
+    """
+    if _is_large_n(len(df), large_n):
+        return _plot_paired_density(df, results_path, fmt)
+
     fig, ax = plt.subplots(figsize=(12, 7))
     
     # Sort by group for better visualization
@@ -294,26 +439,128 @@ def plot_paired_comparison(df, results_path='results'):
              fontsize=10, loc='upper left', ncol=2)
     
     plt.tight_layout()
-    out_path = Path(results_path) / 'plot_paired_comparison.png'
-    plt.savefig(out_path, dpi=300, bbox_inches='tight')
-    print(f"Gráfico guardado: {out_path}")
-    plt.close()
+    return _save_figure(fig, results_path, 'plot_paired_comparison', fmt)
+
+
+def extract_anova_table(analysis_path='results/analysis_results.txt'):
+    """Return the ANOVA block of analysis_results.txt (empty string if missing)"""
+    try:
+        lines = Path(analysis_path).read_text(encoding='utf-8').splitlines()
+    except FileNotFoundError:
+        return ''
+
+    block = []
+    for line in lines:
+        if not block:
+            if line.startswith('Mixed ANOVA') or line.startswith('pingouin not available'):
+                block.append(line)
+        elif line.strip() == '':
+            break
+        else:
+            block.append(line)
+    return '\n'.join(block)
+
+
+REPORT_TEMPLATE = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Resultados - PEC Psicología de la Memoria</title>
+<style>
+body{{font-family:Inter,system-ui,Arial,sans-serif;max-width:1100px;margin:24px auto;padding:0 16px;color:#111827}}
+h1{{font-size:22px}} h2{{font-size:17px;margin-top:32px}}
+table{{border-collapse:collapse;font-size:13px}}
+th,td{{border:1px solid #d1d5db;padding:4px 8px;text-align:right}}
+th{{background:#f3f4f6}}
+pre{{background:#f9fafb;border:1px solid #e5e7eb;padding:10px;font-size:12px;overflow:auto}}
+figure{{margin:16px 0}} figure svg{{max-width:100%;height:auto}}
+</style>
+</head>
+<body>
+<h1>Resultados - Niveles de Procesamiento (Grupo × Procesamiento)</h1>
+<h2>Tabla 1</h2>
+{table1}
+<h2>ANOVA mixta 2×2</h2>
+<pre>{anova}</pre>
+<h2>Gráficos</h2>
+{figures}
+</body>
+</html>
+"""
+
+
+def table1_html(df, large_n, table1_path):
+    """
+    Table 1 as HTML; with many participants only the per-group summary, so the
+    report size does not grow with N
+    """
+    fmt = lambda v: f'{v:.2f}'
+    if not large_n:
+        return df.to_html(index=False, float_format=fmt, border=0)
+
+    summary = df.groupby('Group', sort=True).agg(
+        n=('Participant', 'size'),
+        Perc_S_mean=('Perc_S', 'mean'), Perc_S_sd=('Perc_S', 'std'),
+        Perc_A_mean=('Perc_A', 'mean'), Perc_A_sd=('Perc_A', 'std'),
+    ).reset_index()
+    note = (f'<p>{len(df)} participantes: se muestra el resumen por grupo. '
+            f'La tabla completa está en <code>{html.escape(str(table1_path))}</code>.</p>')
+    return note + summary.to_html(index=False, float_format=fmt, border=0)
+
+
+def generate_html_report(table1_path='results/table1.csv', results_path='results',
+                         analysis_path=None, large_n=None, threshold=LARGE_N_THRESHOLD):
+    """
+    Write results/report.html: Table 1 (per-group summary above the large-N
+    threshold), the ANOVA table and the five charts as inline SVG
+    """
+    data = load_data(table1_path)
+    if data is None:
+        return 1
+
+    df, long = data
+    large_n = _is_large_n(len(df), large_n, threshold)
+    if analysis_path is None:
+        analysis_path = Path(table1_path).parent / 'analysis_results.txt'
+
+    print("\nGenerando informe HTML (SVG)...")
+    figures = [
+        plot_means_by_condition(long, results_path, fmt='svg'),
+        plot_interaction(long, results_path, fmt='svg'),
+        plot_distributions(long, results_path, fmt='svg', large_n=large_n),
+        plot_boxplots(long, results_path, fmt='svg', large_n=large_n),
+        plot_paired_comparison(df, results_path, fmt='svg', large_n=large_n),
+    ]
+
+    anova = extract_anova_table(analysis_path) or 'ANOVA no disponible (ejecuta analyze_recall.py primero).'
+    page = REPORT_TEMPLATE.format(
+        table1=table1_html(df, large_n, table1_path),
+        anova=html.escape(anova),
+        figures='\n'.join(f'<figure>{svg}</figure>' for svg in figures),
+    )
+
+    out_path = Path(results_path) / 'report.html'
+    out_path.write_text(page, encoding='utf-8')
+    print(f"Informe guardado: {out_path}")
+    return 0
 
 
-def generate_all_plots(table1_path='results/table1.csv', results_path='results'):
-    """Generate all plots"""
+def generate_all_plots(table1_path='results/table1.csv', results_path='results', large_n=None,
+                       threshold=LARGE_N_THRESHOLD):
+    """Generate all plots (large_n=None switches to binned rendering above `threshold` participants)"""
     data = load_data(table1_path)
     if data is None:
         return 1
     
     df, long = data
+    large_n = _is_large_n(len(df), large_n, threshold)
     
     print("\nGenerando gráficos...")
     plot_means_by_condition(long, results_path)
     plot_interaction(long, results_path)
-    plot_distributions(long, results_path)
-    plot_boxplots(long, results_path)
-    plot_paired_comparison(df, results_path)
+    plot_distributions(long, results_path, large_n=large_n)
+    plot_boxplots(long, results_path, large_n=large_n)
+    plot_paired_comparison(df, results_path, large_n=large_n)
     
     print("\n[OK] Todos los gráficos han sido generados exitosamente.")
     return 0
@@ -327,7 +574,17 @@ if __name__ == '__main__':
                        help='Ruta a table1.csv (default: results/table1.csv)')
     parser.add_argument('--out', default='results',
                        help='Carpeta de salida (default: results)')
+    parser.add_argument('--format', choices=['png', 'html'], default='png',
+                       help='png: un PNG de 300 dpi por gráfico; html: informe único con SVG (default: png)')
+    parser.add_argument('--large-n-threshold', type=int, default=LARGE_N_THRESHOLD,
+                       help='Nº de participantes a partir del cual se usan gráficos agregados '
+                            f'(default: {LARGE_N_THRESHOLD})')
     args = parser.parse_args()
     
-    rc = generate_all_plots(table1_path=args.table, results_path=args.out)
+    if args.format == 'html':
+        rc = generate_html_report(table1_path=args.table, results_path=args.out,
+                                  threshold=args.large_n_threshold)
+    else:
+        rc = generate_all_plots(table1_path=args.table, results_path=args.out,
+                                threshold=args.large_n_threshold)
     sys.exit(rc)
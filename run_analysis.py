@@ -5,7 +5,9 @@ run_analysis.py
 Script wrapper que ejecuta el pipeline completo de análisis:
 1. normalize_recalls.py   — Normaliza los fields de recall en datos/
 2. analyze_recall.py      — Procesa datos normalizados y genera table1.csv (separado por grupo) + análisis estadístico
-3. plot_results.py        — Genera gráficos basados en table1.csv
+3. analyze_rt.py          — Tiempos de respuesta de la fase de estudio (si el CSV incluye rt_ms)
+4. analyze_order.py       — Orden de recuerdo: lag-CRP, factor temporal y primer recuerdo
+5. plot_results.py        — Genera gráficos basados en table1.csv
 
 Uso:
     python run_analysis.py
@@ -32,7 +34,7 @@ def run_pipeline():
     print()
     
     # Step 1: Normalize recalls
-    print("[1/3] Normalizando archivos de recall...")
+    print("[1/5] Normalizando archivos de recall...")
     print("-"*70)
     try:
         result = subprocess.run(
@@ -54,7 +56,7 @@ def run_pipeline():
     print()
     
     # Step 2: Analyze recall
-    print("[2/3] Analizando datos de recall (table1 y ANOVA)...")
+    print("[2/5] Analizando datos de recall (table1 y ANOVA)...")
     print("-"*70)
     try:
         result = subprocess.run(
@@ -75,8 +77,52 @@ def run_pipeline():
     
     print()
     
-    # Step 3: Plot results
-    print("[3/3] Generando gráficos...")
+    # Step 3: Response times
+    print("[3/5] Analizando tiempos de respuesta...")
+    print("-"*70)
+    try:
+        result = subprocess.run(
+            [sys.executable, str(root / 'analyze_rt.py'), '--datos', 'datos/normalized'],
+            cwd=str(root),
+            capture_output=True,
+            text=True
+        )
+        print(result.stdout)
+        if result.stderr:
+            print("Warnings/Errors:", result.stderr)
+        if result.returncode != 0:
+            print(f"Error en analyze_rt.py (código {result.returncode})")
+            return 1
+    except Exception as e:
+        print(f"Error ejecutando analyze_rt.py: {e}")
+        return 1
+    
+    print()
+    
+    # Step 4: Recall order
+    print("[4/5] Analizando el orden de recuerdo (lag-CRP)...")
+    print("-"*70)
+    try:
+        result = subprocess.run(
+            [sys.executable, str(root / 'analyze_order.py'), '--datos', 'datos/normalized'],
+            cwd=str(root),
+            capture_output=True,
+            text=True
+        )
+        print(result.stdout)
+        if result.stderr:
+            print("Warnings/Errors:", result.stderr)
+        if result.returncode != 0:
+            print(f"Error en analyze_order.py (código {result.returncode})")
+            return 1
+    except Exception as e:
+        print(f"Error ejecutando analyze_order.py: {e}")
+        return 1
+    
+    print()
+    
+    # Step 5: Plot results
+    print("[5/5] Generando gráficos...")
     print("-"*70)
     try:
         result = subprocess.run(
@@ -103,6 +149,8 @@ def run_pipeline():
     print("Archivos generados:")
     print(f"  - results/table1.csv              (Tabla resumen, separada por grupo)")
     print(f"  - results/analysis_results.txt    (Análisis estadístico: ANOVA, paired t-tests)")
+    print(f"  - results/rt_results.txt          (Tiempos de respuesta, si hay rt_ms en los CSV)")
+    print(f"  - results/recall_order_results.txt (Orden de recuerdo: lag-CRP, factor temporal, primer recuerdo)")
     print(f"  - results/plot_*.png              (Gráficos: medias, interacción, distribuciones, boxplot, paired)")
     print()
     
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+score_attention.py
+
+Puntúa la tarea de atención (distractor) exportada por `index.html`
+(columnas `filler_letters` y `filler_marked`). La regla es: marcar toda "c"
+precedida de "a" o seguida de "e". Para todos los participantes a la vez se
+calculan aciertos, falsas alarmas y d′ (con corrección log-lineal), usando
+desplazamientos de arrays NumPy sobre una matriz participante × posición.
+
+`analyze_recall.py` usa `score_attention()` para añadir las columnas Att_* a la
+Tabla 1 y, opcionalmente, excluir participantes por debajo de un umbral de d′.
+
+Uso independiente:
+    python score_attention.py --datos datos/normalized
+Salida: `results/attention_scores.csv`
+
+Dependencias: pandas, numpy, scipy
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from archive_io import first_row
+from dedup import iter_unique_exports
+
+PAD = ord(' ')
+
+
+def parse_marked(text):
+    """'3 17 22' -> [3, 17, 22]; empty/missing -> []"""
+    if not isinstance(text, str):
+        return []
+    return [int(tok) for tok in text.split() if tok.isdigit()]
+
+
+def score_attention(letters, marked):
+    """
+    Score the attention task for many participants in one pass.
+
+    letters: sequence of letter strings (one per participant, '' or NaN if missing)
+    marked: sequence of lists of marked positions into the matching letter string
+
+    Returns a DataFrame (one row per participant, same order) with columns
+    Att_targets, Att_hits, Att_FA, Att_hit_rate, Att_FA_rate, Att_dprime.
+    Participants without letters get NaN.
+    """
+    letters = [s if isinstance(s, str) else '' for s in letters]
+    n = len(letters)
+    width = max((len(s) for s in letters), default=0)
+
+    # participant x position matrix of letter codes, padded with spaces
+    grid = np.full((n, max(width, 1)), PAD, dtype=np.uint8)
+    for i, s in enumerate(letters):
+        if s:
+            grid[i, :len(s)] = np.frombuffer(s.encode('ascii', 'replace'), dtype=np.uint8)
+    valid = grid != PAD
+
+    # rule: 'c' preceded by 'a' or followed by 'e', via one-column shifts
+    prev_a = np.zeros_like(valid)
+    prev_a[:, 1:] = grid[:, :-1] == ord('a')
+    next_e = np.zeros_like(valid)
+    next_e[:, :-1] = grid[:, 1:] == ord('e')
+    target = (grid == ord('c')) & (prev_a | next_e)
+
+    rows = np.repeat(np.arange(n), [len(m) for m in marked])
+    cols = np.fromiter((j for m in marked for j in m), dtype=np.int64, count=rows.size)
+    keep = cols < grid.shape[1]
+    marks = np.zeros_like(valid)
+    marks[rows[keep], cols[keep]] = True
+    marks &= valid
+
+    n_targets = target.sum(axis=1)
+    n_nontargets = (valid & ~target).sum(axis=1)
+    hits = (marks & target).sum(axis=1)
+    false_alarms = (marks & ~target).sum(axis=1)
+
+    # log-linear correction keeps z finite when a rate is 0 or 1
+    hit_rate = (hits + 0.5) / (n_targets + 1)
+    fa_rate = (false_alarms + 0.5) / (n_nontargets + 1)
+    dprime = stats.norm.ppf(hit_rate) - stats.norm.ppf(fa_rate)
+
+    has_task = valid.any(axis=1)
+    out = pd.DataFrame({
+        'Att_targets': n_targets,
+        'Att_hits': hits,
+        'Att_FA': false_alarms,
+        'Att_hit_rate': hits / np.maximum(n_targets, 1),
+        'Att_FA_rate': false_alarms / np.maximum(n_nontargets, 1),
+        'Att_dprime': dprime,
+    }).astype(float)
+    out.loc[~has_task, :] = np.nan
+    return out
+
+
+def main(datos_path='datos/normalized', results_path='results', duplicates='drop'):
+    pids, letters, marked = [], [], []
+    for pid, text in iter_unique_exports(datos_path, duplicates):
+        first = first_row(text)
+        if first is None:
+            continue
+        pids.append(pid)
+        letters.append(first.get('filler_letters'))
+        marked.append(parse_marked(first.get('filler_marked')))
+
+    if not pids:
+        print(f"No se encontraron CSVs en {Path(datos_path).resolve()}")
+        return 1
+
+    scores = score_attention(letters, marked)
+    scores.insert(0, 'Participant', pids)
+
+    results = Path(results_path)
+    results.mkdir(parents=True, exist_ok=True)
+    out_path = results / 'attention_scores.csv'
+    scores.to_csv(out_path, index=False)
+    print(f"Puntuaciones de atención guardadas en: {out_path}")
+    print(f"  - Participantes con tarea de atención exportada: {int(scores['Att_dprime'].notna().sum())}/{len(scores)}")
+    return 0
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser(description='Puntúa la tarea de atención (aciertos, falsas alarmas, d′)')
+    p.add_argument('--datos', default='datos/normalized',
+                   help='Carpeta con los CSV o archivo .zip/.tar.gz (default: datos/normalized)')
+    p.add_argument('--out', default='results', help='Carpeta para resultados (default: results)')
+    p.add_argument('--duplicates', choices=['drop', 'flag'], default='drop',
+                   help='Envíos duplicados (huella exacta o cercana): excluirlos (drop, default) '
+                        'o mantenerlos y solo reportarlos (flag)')
+    args = p.parse_args()
+
+    sys.exit(main(datos_path=args.datos, results_path=args.out, duplicates=args.duplicates))
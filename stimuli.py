@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+stimuli.py
+
+Carga el manifiesto de estímulos `stimuli.json` (palabras, categorías,
+secuencia de tareas `cueSeq` y la inversión de tareas de la lista B), que es la
+única fuente de la lista de palabras tanto para `index.html` como para los
+scripts de Python.
+
+El manifiesto se compila una vez en un binario cacheado
+(`.cache/stimuli-v<versión>-<hash>.pkl`) con las tablas de consulta que usa el
+análisis: palabra → índice, formas normalizadas y máscaras S/A por lista. La
+clave de la caché es `CACHE_VERSION` más el hash SHA-256 del manifiesto, de modo
+que cambiar la lista de palabras recompila la caché; al cambiar las tablas que
+produce `compile_manifest()` hay que subir `CACHE_VERSION`. Cualquier caché
+derivada del manifiesto debe incluir `stim['hash']` en su clave para
+invalidarse igual.
+
+Uso:
+    from stimuli import load_stimuli
+    stim = load_stimuli()
+    stim['masks']['A']['S']   # máscara booleana de las palabras S en la lista A
+"""
+
+import hashlib
+import json
+import pickle
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+
+BASE = Path(__file__).parent
+MANIFEST_PATH = BASE / 'stimuli.json'
+CACHE_DIR = BASE / '.cache'
+# bump whenever compile_manifest() changes the shape of the tables it returns
+CACHE_VERSION = 1
+
+_loaded = {}
+
+
+def fold_word(s):
+    """Lowercase and strip diacritics (same form as analyze_recall.normalize_text for a single word)"""
+    s = unicodedata.normalize('NFKD', str(s).lower())
+    return ''.join(ch for ch in s if not unicodedata.combining(ch)).strip()
+
+
+def compile_manifest(manifest, digest):
+    """Build the lookup tables from the parsed manifest"""
+    words = tuple(item['word'] for item in manifest['items'])
+    categories = tuple(item.get('category') for item in manifest['items'])
+    category_names = sorted({c for c in categories if c})
+    cue_seq = np.array(manifest['cueSeq'])
+    if len(cue_seq) != len(words):
+        raise ValueError(f"cueSeq tiene {len(cue_seq)} elementos pero hay {len(words)} palabras")
+
+    cues = {}
+    masks = {}
+    for name, spec in manifest['lists'].items():
+        seq = np.where(cue_seq == 'A', 'S', 'A') if spec.get('inverted') else cue_seq.copy()
+        cues[name] = seq
+        masks[name] = {'S': seq == 'S', 'A': seq == 'A'}
+
+    normalized = tuple(fold_word(w) for w in words)
+    return {
+        'hash': digest,
+        'words': words,
+        'word_index': {w: i for i, w in enumerate(words)},
+        'normalized': normalized,
+        'norm_index': {w: i for i, w in enumerate(normalized)},
+        'categories': categories,
+        'category_names': category_names,
+        'category_codes': np.array([category_names.index(c) if c else -1 for c in categories]),
+        'cues': cues,
+        'masks': masks,
+    }
+
+
+def load_stimuli(path=MANIFEST_PATH, cache_dir=CACHE_DIR):
+    """
+    Return the compiled stimulus tables, reusing `.cache/stimuli-v<CACHE_VERSION>-<hash>.pkl`
+    when neither the manifest nor the table layout has changed.
+    """
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if digest in _loaded:
+        return _loaded[digest]
+
+    cache_path = Path(cache_dir) / f'stimuli-v{CACHE_VERSION}-{digest[:16]}.pkl'
+    stim = None
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'rb') as fh:
+                stim = pickle.load(fh)
+        except Exception:
+            stim = None
+        if stim is not None and stim.get('hash') != digest:
+            stim = None
+
+    if stim is None:
+        stim = compile_manifest(json.loads(raw.decode('utf-8')), digest)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'wb') as fh:
+                pickle.dump(stim, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            # read-only checkout: keep the compiled tables in memory only
+            pass
+
+    _loaded[digest] = stim
+    return stim
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+suffstats.py
+
+ANOVA mixta 2×2 (Grupo entre-sujetos × Procesamiento S/A intra-sujetos) y
+pruebas t pareadas calculadas en forma cerrada a partir de los estadísticos
+suficientes de cada grupo:
+
+    [n, ΣS, ΣA, ΣS², ΣA², ΣS·A]
+
+Con un factor intra de dos niveles la ANOVA mixta se descompone en la media
+por participante m = (S + A) / 2 (efecto Grupo) y la diferencia d = S − A
+(efectos Procesamiento e Interacción), así que todo se obtiene de esas sumas.
+
+Como las sumas se pueden restar, el diagnóstico leave-one-out no re-ajusta N
+modelos: resta la contribución de cada participante a las sumas de su grupo y
+evalúa todas las ANOVA a la vez (O(N)). Las funciones aceptan dimensiones
+iniciales extra (`...`) para evaluar muchos conjuntos de sumas vectorizados.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+N, SUM_S, SUM_A, SUM_SS, SUM_AA, SUM_SA = range(6)
+N_STATS = 6
+
+
+def participant_stats(s, a):
+    """Per-participant contribution to the sufficient statistics, shape (N, 6)"""
+    s = np.asarray(s, dtype=float)
+    a = np.asarray(a, dtype=float)
+    return np.column_stack([np.ones_like(s), s, a, s * s, a * a, s * a])
+
+
+def group_sums(s, a, group_codes, n_groups):
+    """Sufficient statistics per group, shape (n_groups, 6)"""
+    contrib = participant_stats(s, a)
+    return np.column_stack([
+        np.bincount(group_codes, weights=contrib[:, j], minlength=n_groups)
+        for j in range(N_STATS)
+    ])
+
+
+def _derived(sums):
+    """Per-group n, Σm, Σm², Σd, Σd² from [n, ΣS, ΣA, ΣS², ΣA², ΣSA]"""
+    n = sums[..., N]
+    sm = (sums[..., SUM_S] + sums[..., SUM_A]) / 2
+    smm = (sums[..., SUM_SS] + 2 * sums[..., SUM_SA] + sums[..., SUM_AA]) / 4
+    sd = sums[..., SUM_S] - sums[..., SUM_A]
+    sdd = sums[..., SUM_SS] - 2 * sums[..., SUM_SA] + sums[..., SUM_AA]
+    return n, sm, smm, sd, sdd
+
+
+def cell_means(sums):
+    """Mean S and mean A per group: arrays of shape (..., k)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums[..., SUM_S] / sums[..., N], sums[..., SUM_A] / sums[..., N]
+
+
+def mixed_anova(sums):
+    """
+    2×2 mixed ANOVA from group sums of shape (..., k, 6).
+
+    Returns a dict of arrays with SS, DF1, DF2, F and p for 'Group',
+    'Processing' and 'Interaction' (same partition as pingouin.mixed_anova).
+    """
+    sums = np.asarray(sums, dtype=float)
+    n, sm, smm, sd, sdd = _derived(sums)
+    k = (n > 0).sum(axis=-1)
+    n_tot = n.sum(axis=-1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # between subjects: participant means m
+        m_bar = sm.sum(axis=-1) / n_tot
+        ss_group = 2 * ((sm ** 2 / n).sum(axis=-1, where=n > 0) - n_tot * m_bar ** 2)
+        ss_err_b = 2 * (smm.sum(axis=-1) - (sm ** 2 / n).sum(axis=-1, where=n > 0))
+
+        # within subjects: differences d
+        d_bar = sd.sum(axis=-1) / n_tot
+        ss_proc = n_tot * d_bar ** 2 / 2
+        ss_inter = ((sd ** 2 / n).sum(axis=-1, where=n > 0) - n_tot * d_bar ** 2) / 2
+        ss_err_w = (sdd.sum(axis=-1) - (sd ** 2 / n).sum(axis=-1, where=n > 0)) / 2
+
+        df_b = k - 1
+        df_err = n_tot - k
+        f_group = (ss_group / df_b) / (ss_err_b / df_err)
+        f_proc = ss_proc / (ss_err_w / df_err)
+        f_inter = (ss_inter / df_b) / (ss_err_w / df_err)
+
+    return {
+        'Group': {'SS': ss_group, 'DF1': df_b, 'DF2': df_err, 'F': f_group,
+                  'p': stats.f.sf(f_group, df_b, df_err)},
+        'Processing': {'SS': ss_proc, 'DF1': np.ones_like(df_b), 'DF2': df_err, 'F': f_proc,
+                       'p': stats.f.sf(f_proc, 1, df_err)},
+        'Interaction': {'SS': ss_inter, 'DF1': df_b, 'DF2': df_err, 'F': f_inter,
+                        'p': stats.f.sf(f_inter, df_b, df_err)},
+    }
+
+
+def paired_test(sums, alpha=0.05):
+    """
+    Paired t-test S vs A from sums of shape (..., 6) (one group, or groups already added).
+
+    Returns mean_diff, ci_low, ci_high, t, p, n (arrays); t and p are NaN where
+    every difference is the same (zero variance up to round-off).
+    """
+    sums = np.asarray(sums, dtype=float)
+    n, _, _, sd, sdd = _derived(sums)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        md = sd / n
+        constant = np.isclose(sdd / n, md ** 2, rtol=1e-9, atol=1e-9)
+        # clamp round-off below zero when all differences are equal
+        var = np.maximum(sdd - sd ** 2 / n, 0) / (n - 1)
+        se = np.sqrt(var / n)
+        t = np.where(constant, np.nan, md / se)
+        df = n - 1
+        p = 2 * stats.t.sf(np.abs(t), df)
+        tcrit = stats.t.ppf(1 - alpha / 2, df)
+    return md, md - tcrit * se, md + tcrit * se, t, p, n
+
+
+def between_test(sums, cue):
+    """
+    One-way between-group F test on the S or A scores (cue 'S'/'A') from group
+    sums of shape (..., k, 6); with two groups F = t² of the pooled-variance t-test.
+
+    Returns F, DF1, DF2, p (arrays).
+    """
+    sums = np.asarray(sums, dtype=float)
+    sx_i, sxx_i = (SUM_S, SUM_SS) if cue == 'S' else (SUM_A, SUM_AA)
+    n = sums[..., N]
+    sx = sums[..., sx_i]
+    sxx = sums[..., sxx_i]
+    k = (n > 0).sum(axis=-1)
+    n_tot = n.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        between = (sx ** 2 / n).sum(axis=-1, where=n > 0)
+        ss_b = between - sx.sum(axis=-1) ** 2 / n_tot
+        ss_w = sxx.sum(axis=-1) - between
+        df1 = k - 1
+        df2 = n_tot - k
+        f = (ss_b / df1) / (ss_w / df2)
+    return f, df1, df2, stats.f.sf(f, df1, df2)
+
+
+def mean_ci(sum_x, sum_xx, n, alpha=0.05):
+    """Mean and t-based CI from Σx, Σx², n"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        m = sum_x / n
+        se = np.sqrt(np.maximum(sum_xx - sum_x ** 2 / n, 0) / (n - 1) / n)
+        tcrit = stats.t.ppf(1 - alpha / 2, n - 1)
+    return m, m - tcrit * se, m + tcrit * se
+
+
+def format_anova(res):
+    """Render a mixed_anova() result (scalar sums) as a text table"""
+    table = pd.DataFrame([
+        {'Source': src, 'SS': float(r['SS']), 'DF1': int(r['DF1']), 'DF2': int(r['DF2']),
+         'F': float(r['F']), 'p-unc': float(r['p'])}
+        for src, r in res.items()
+    ])
+    return table.to_string()
+
+
+def leave_one_out(dfp, sums=None, groups=None):
+    """
+    Leave-one-out influence of every participant on the cell means, the ANOVA F
+    values and the paired-test p-values, from closed-form downdates of the group
+    sufficient statistics (no refits).
+
+    dfp: per-participant table with Participant, Group, Perc_S, Perc_A.
+    sums/groups: full-sample group sums and their group labels, when `dfp` is only
+    a chunk of the sample (streaming mode); computed from `dfp` otherwise.
+    Returns one row per participant.
+    """
+    d = dfp.dropna(subset=['Perc_S', 'Perc_A']).reset_index(drop=True)
+    s = d['Perc_S'].to_numpy(dtype=float)
+    a = d['Perc_A'].to_numpy(dtype=float)
+    if sums is None:
+        codes, groups = pd.factorize(d['Group'], sort=True)
+        sums = group_sums(s, a, codes, len(groups))
+    else:
+        codes = pd.Index(groups).get_indexer(d['Group'])
+        if (codes < 0).any():
+            unknown = sorted(set(d['Group'][codes < 0].astype(str)))
+            raise ValueError(f"leave_one_out: groups {unknown} are not in the full-sample sums")
+        sums = np.asarray(sums, dtype=float)
+    k = len(groups)
+
+    contrib = participant_stats(s, a)
+
+    # (N, k, 6): full sums with participant i removed from its own group
+    onehot = np.eye(k)[codes]
+    loo = sums[None, :, :] - onehot[:, :, None] * contrib[:, None, :]
+
+    full = mixed_anova(sums)
+    part = mixed_anova(loo)
+    rows = np.arange(len(d))
+
+    mean_s, mean_a = cell_means(sums)
+    loo_s, loo_a = cell_means(loo)
+
+    _, _, _, _, p_all, _ = paired_test(sums.sum(axis=0))
+    _, _, _, _, p_all_loo, _ = paired_test(loo.sum(axis=1))
+    _, _, _, _, p_grp, _ = paired_test(sums)
+    _, _, _, _, p_grp_loo, _ = paired_test(loo[rows, codes])
+
+    out = pd.DataFrame({
+        'Participant': d['Participant'].to_numpy(),
+        'Group': d['Group'].to_numpy(),
+        'dMean_S': loo_s[rows, codes] - mean_s[codes],
+        'dMean_A': loo_a[rows, codes] - mean_a[codes],
+    })
+    for src in ['Group', 'Processing', 'Interaction']:
+        out[f'F_{src}_loo'] = part[src]['F']
+        with np.errstate(invalid='ignore'):
+            # inf - inf when a downdate leaves no error variance
+            out[f'dF_{src}'] = part[src]['F'] - full[src]['F']
+        out[f'p_{src}_loo'] = part[src]['p']
+    out['p_paired_loo'] = p_all_loo
+    out['dp_paired'] = p_all_loo - p_all
+    out['p_paired_group_loo'] = p_grp_loo
+    out['dp_paired_group'] = p_grp_loo - p_grp[codes]
+    return out
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+sweep.py
+
+Barrido por subgrupos: ¿se mantiene el efecto S vs A dentro de cada nivel de
+sexo, franja de edad, estudios o versión de la lista? En vez de filtrar CSVs y
+volver a ejecutar `analyze_recall.py` por cada subgrupo, se parte de la Tabla 1
+y se calculan para todos los subgrupos a la vez, en una pasada agrupada
+(`np.bincount` sobre subgrupo × grupo), los estadísticos suficientes de
+`suffstats.py`. A partir de ellos se obtienen en forma vectorizada:
+
+- efecto simple de Procesamiento (S − A, t pareada) dentro de cada Grupo y en total
+- efecto simple de Grupo (F entre-sujetos; t² con dos grupos) en S y en A
+- interacción Grupo × Procesamiento de la ANOVA mixta
+
+Los p-valores se corrigen sobre toda la familia de pruebas del barrido (Holm y
+Benjamini-Hochberg). Con `--depth 2` también se barren los cruces de dos
+variables (p. ej. sexo × lista).
+
+Uso:
+    python sweep.py                                  # sexo, edad, estudios y lista
+    python sweep.py --by sexo list --depth 2 --min-n 3
+Salida: `results/subgroup_sweep.csv` (una fila por prueba)
+
+Dependencias: pandas, numpy, scipy
+"""
+
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import suffstats
+
+# command-line names -> Table 1 columns
+VARIABLES = {'sexo': 'Sexo', 'edad': 'Edad', 'estudios': 'Estudios', 'list': 'List'}
+AGE_BANDS = [25, 35, 50]
+
+
+def holm(p):
+    """Holm step-down adjusted p-values (NaN left out of the family)"""
+    p = np.asarray(p, dtype=float)
+    out = np.full(p.shape, np.nan)
+    ok = np.flatnonzero(np.isfinite(p))
+    order = ok[np.argsort(p[ok], kind='stable')]
+    m = len(order)
+    adj = np.maximum.accumulate((m - np.arange(m)) * p[order])
+    out[order] = np.minimum(adj, 1)
+    return out
+
+
+def fdr_bh(p):
+    """Benjamini-Hochberg adjusted p-values (NaN left out of the family)"""
+    p = np.asarray(p, dtype=float)
+    out = np.full(p.shape, np.nan)
+    ok = np.flatnonzero(np.isfinite(p))
+    order = ok[np.argsort(p[ok], kind='stable')]
+    m = len(order)
+    adj = np.minimum.accumulate((m / np.arange(m, 0, -1) * p[order[::-1]]))[::-1]
+    out[order] = np.minimum(adj, 1)
+    return out
+
+
+def age_bands(edad, cuts=AGE_BANDS):
+    """Numeric ages -> band labels such as '<25', '25-34', '50+' (NaN when missing)"""
+    edges = [-np.inf] + list(cuts) + [np.inf]
+    labels = [f'<{cuts[0]}'] + [f'{lo}-{hi - 1}' for lo, hi in zip(cuts[:-1], cuts[1:])] + [f'{cuts[-1]}+']
+    return pd.cut(pd.to_numeric(edad, errors='coerce'), edges, right=False, labels=labels).astype(object)
+
+
+def load_table1(path):
+    """Participant rows of Table 1 (section comments and group-mean rows dropped)"""
+    df = pd.read_csv(path, comment='#', dtype={'Sexo': str, 'Estudios': str, 'List': str})
+    df = df.loc[~df['Participant'].astype(str).str.startswith('Group_Mean')]
+    return df.dropna(subset=['Perc_S', 'Perc_A']).reset_index(drop=True)
+
+
+def slice_sums(df, specs, group_codes, n_groups):
+    """
+    Group sufficient statistics for every slice of every spec in one bincount each.
+
+    specs: list of column tuples, e.g. [('Sexo',), ('Sexo', 'List')]
+    Returns (labels, sums) with labels a list of (variables, levels) and sums of
+    shape (n_slices, n_groups, 6).
+    """
+    contrib = suffstats.participant_stats(df['Perc_S'], df['Perc_A'])
+    labels = []
+    blocks = []
+    for spec in specs:
+        keys = df[list(spec)].astype(str).where(df[list(spec)].notna())
+        complete = keys.notna().all(axis=1).to_numpy()
+        codes, levels = pd.MultiIndex.from_frame(keys[complete]).factorize(sort=True)
+        n_slices = len(levels)
+        key = codes * n_groups + group_codes[complete]
+        sums = np.stack([
+            np.bincount(key, weights=contrib[complete, j], minlength=n_slices * n_groups)
+            for j in range(suffstats.N_STATS)
+        ], axis=-1).reshape(n_slices, n_groups, suffstats.N_STATS)
+        blocks.append(sums)
+        labels.extend((spec, level) for level in levels)
+    if not blocks:
+        return labels, np.zeros((0, n_groups, suffstats.N_STATS))
+    return labels, np.concatenate(blocks)
+
+
+def sweep(df, by, depth=1, min_n=2, group_col='Group'):
+    """
+    Tidy table with one row per (slice, test): simple effects, paired tests and
+    interaction for every slice, with Holm and BH corrections over the whole family
+    """
+    group_codes, groups = pd.factorize(df[group_col], sort=True)
+    k = len(groups)
+    specs = [combo for d in range(1, depth + 1) for combo in itertools.combinations(by, d)]
+    labels, sums = slice_sums(df, specs, group_codes, k)
+    n_slices = len(labels)
+
+    n = sums[..., suffstats.N]
+    enough = n >= min_n                        # (slices, groups)
+    all_enough = enough.all(axis=1)
+
+    rows = []
+
+    def add(effect, group, cue, n_used, estimate, stat, df1, df2, p, keep):
+        rows.append(pd.DataFrame({
+            'Slice': np.arange(n_slices), 'Effect': effect, 'Group': group, 'Cue': cue,
+            'n': n_used, 'Estimate': estimate, 'Statistic': np.where(keep, stat, np.nan),
+            'DF1': df1, 'DF2': df2, 'p': np.where(keep, p, np.nan),
+        }))
+
+    # Processing simple effect within each group: paired t on S − A
+    # (a group whose differences are all equal has no usable t; paired_test gives NaN)
+    md, _, _, t, p, n_g = suffstats.paired_test(sums)
+    for gi, g in enumerate(groups):
+        add('Processing (S - A)', g, '', n_g[:, gi], md[:, gi], t[:, gi],
+            n_g[:, gi] - 1, np.nan, p[:, gi], enough[:, gi])
+
+    # overall paired test (groups pooled)
+    pooled = sums.sum(axis=1)
+    md, _, _, t, p, n_all = suffstats.paired_test(pooled)
+    add('Processing (S - A)', 'all', '', n_all, md, t, n_all - 1, np.nan, p, n_all >= min_n)
+
+    # Group simple effect at each processing level
+    mean_s, mean_a = suffstats.cell_means(sums)
+    for cue, means in [('S', mean_s), ('A', mean_a)]:
+        f, df1, df2, p = suffstats.between_test(sums, cue)
+        estimate = means[:, 0] - means[:, 1] if k == 2 else np.full(n_slices, np.nan)
+        add('Group', '', cue, n_all, estimate, f, df1, df2, p, all_enough & (k > 1))
+
+    # Group x Processing interaction from the mixed ANOVA
+    inter = suffstats.mixed_anova(sums)['Interaction']
+    d_s = mean_s - mean_a
+    estimate = d_s[:, 0] - d_s[:, 1] if k == 2 else np.full(n_slices, np.nan)
+    add('Interaction', '', '', n_all, estimate, inter['F'], inter['DF1'], inter['DF2'], inter['p'],
+        all_enough & (k > 1))
+
+    out = pd.concat(rows, ignore_index=True)
+    out.insert(1, 'Variable', [' x '.join(labels[i][0]) for i in out['Slice']])
+    out.insert(2, 'Level', [' x '.join(labels[i][1]) for i in out['Slice']])
+    out = out.sort_values(['Slice', 'Effect', 'Group', 'Cue'], kind='stable').drop(columns='Slice')
+    out['p_holm'] = holm(out['p'])
+    out['p_fdr_bh'] = fdr_bh(out['p'])
+    return out.reset_index(drop=True)
+
+
+def main(table_path='results/table1.csv', results_path='results', by=None, depth=1,
+         min_n=2, age_cuts=None, alpha=0.05):
+    table_path = Path(table_path)
+    if not table_path.exists():
+        print(f"No existe {table_path}; ejecute antes analyze_recall.py")
+        return 1
+    df = load_table1(table_path)
+    if df.empty:
+        print(f"{table_path} no contiene participantes.")
+        return 1
+
+    by = by or list(VARIABLES)
+    columns = []
+    for name in by:
+        col = VARIABLES[name]
+        if col not in df.columns:
+            print(f"Columna {col} no encontrada en {table_path}; se omite '{name}'.")
+            continue
+        if name == 'edad':
+            df['Edad_banda'] = age_bands(df['Edad'], age_cuts or AGE_BANDS)
+            col = 'Edad_banda'
+        columns.append(col)
+    if not columns:
+        print("No hay variables para el barrido.")
+        return 1
+
+    result = sweep(df, columns, depth=depth, min_n=min_n)
+
+    results = Path(results_path)
+    results.mkdir(parents=True, exist_ok=True)
+    out_path = results / 'subgroup_sweep.csv'
+    result.to_csv(out_path, index=False)
+
+    n_tests = int(result['p'].notna().sum())
+    n_slices = result[['Variable', 'Level']].drop_duplicates().shape[0]
+    print(f"Barrido por subgrupos guardado en: {out_path}")
+    print(f"  - Subgrupos: {n_slices}, pruebas evaluables: {n_tests} (min n por grupo = {min_n})")
+    print(f"  - p < {alpha}: sin corregir {int((result['p'] < alpha).sum())}, "
+          f"Holm {int((result['p_holm'] < alpha).sum())}, BH {int((result['p_fdr_bh'] < alpha).sum())}")
+    return 0
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser(description='Efectos simples, t pareadas e interacción por subgrupos (Holm/BH)')
+    p.add_argument('--table', default='results/table1.csv', help='Tabla 1 generada por analyze_recall.py')
+    p.add_argument('--out', default='results', help='Carpeta para resultados (default: results)')
+    p.add_argument('--by', nargs='+', choices=list(VARIABLES), default=None,
+                   help='Variables de corte (default: sexo edad estudios list)')
+    p.add_argument('--depth', type=int, default=1,
+                   help='Cruzar hasta este número de variables (default: 1, sin cruces)')
+    p.add_argument('--min-n', type=int, default=2,
+                   help='Participantes mínimos por grupo en un subgrupo para evaluar la prueba (default: 2)')
+    p.add_argument('--age-bands', default=None,
+                   help='Cortes de edad separados por comas (default: 25,35,50)')
+    p.add_argument('--alpha', type=float, default=0.05, help='Nivel para el resumen (default: 0.05)')
+    args = p.parse_args()
+
+    cuts = [int(c) for c in args.age_bands.split(',')] if args.age_bands else None
+    sys.exit(main(table_path=args.table, results_path=args.out, by=args.by, depth=args.depth,
+                  min_n=args.min_n, age_cuts=cuts, alpha=args.alpha))